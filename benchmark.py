@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fake_cdn import FakeCDN, synthetic_artifacts
+from installer_core import (BASE_URL_ENV, GAME_DIRS_ENV, LIMIT_RATE_ENV, MIRROR_HEALTH_FILE, MIRRORS_ENV,
+                            REQUIRED_FILES, format_bytes, parse_rate)
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+WINDOW_DRIVER_FLAG = "--drive-window"
+RESULTS_DIR = "benchmark-results"
+CLEAN_NETWORK = {"latency": 0.0, "error_rate": 0.0, "truncate_rate": 0.0, "bundles": True}
+
+SCENARIOS = {
+    "cold": {"prime": False, "keep_mods": False, "network": {}},
+    "cold-per-file": {"prime": False, "keep_mods": False, "network": {"bundles": False}},
+    "warm-cache": {"prime": True, "keep_mods": False, "network": {}},
+    "unchanged-reinstall": {"prime": True, "keep_mods": True, "network": {}},
+    "flaky-network": {"prime": False, "keep_mods": False,
+                      "network": {"latency": 0.02, "error_rate": 0.15, "truncate_rate": 0.15}},
+    "high-latency": {"prime": False, "keep_mods": False, "network": {"latency": 0.25}},
+    "high-latency-per-file": {"prime": False, "keep_mods": False, "network": {"latency": 0.25, "bundles": False}},
+    "low-footprint": {"prime": False, "keep_mods": False, "network": {}, "args": ["--low-footprint"]},
+    "low-footprint-window": {"prime": False, "keep_mods": False, "network": {}, "args": ["--low-footprint"],
+                             "window": True},
+    "mirror-failover": {"prime": False, "keep_mods": False, "network": {"truncate_rate": 1.0, "bundles": False},
+                        "mirror": {"bundles": False}, "expect": {"truncated": 1, "mirror_partial": 1}},
+    "peer-cache": {"prime": False, "keep_mods": False, "network": {}, "args": ["--no-bundle"], "peer": True,
+                   "expect": {"peer_served": len(REQUIRED_FILES)},
+                   "expect_at_most": {"jar_requests": 0, "uplink_jar_requests": len(REQUIRED_FILES)}},
+}
+MEMORY_TARGETS = {
+    "low-footprint": {"traced_peak_kib": 512, "peak_rss_kib": 72 * 1024},
+    "low-footprint-window": {"traced_peak_kib": 1024, "peak_rss_kib": 80 * 1024},
+}
+COMPARED_METRICS = ["seconds", "bytes_sent", "peak_rss_kib"]
+
+def install_env(home: str) -> Dict[str, str]:
+    env = dict(os.environ, HOME=home, USERPROFILE=home, APPDATA=os.path.join(home, "AppData"))
+    for name in (BASE_URL_ENV, GAME_DIRS_ENV, LIMIT_RATE_ENV, MIRRORS_ENV):
+        env.pop(name, None)
+    return env
+
+def run_install(home: str, game_dir: str, base_url: str, minecraft_version: str, extra_args: List[str],
+                window: bool = False) -> Dict:
+    command = [sys.executable, MAIN_SCRIPT, "--install", minecraft_version, "--base-url", base_url,
+               "--game-dir", game_dir, "--no-telemetry"] + extra_args
+    env = install_env(home)
+    if window:
+        command[1:2] = [os.path.abspath(__file__), WINDOW_DRIVER_FLAG]
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    log_path = os.path.join(home, "install.log")
+    started = time.perf_counter()
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_kib = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+            cpu_seconds = usage.ru_utime + usage.ru_stime
+        else:
+            proc.wait()
+            peak_rss_kib = None
+            cpu_seconds = None
+    return {
+        "seconds": round(time.perf_counter() - started, 4),
+        "exit_code": proc.returncode,
+        "peak_rss_kib": peak_rss_kib,
+        "cpu_seconds": None if cpu_seconds is None else round(cpu_seconds, 4),
+        "log": log_path,
+    }
+
+def drive_window(argv: List[str]) -> int:
+    from PyQt5 import QtCore, QtWidgets
+    import main as installer_main
+    from installer_core import MemoryProfiler
+    args, qt_args = installer_main.parse_args([MAIN_SCRIPT] + argv)
+    memory = MemoryProfiler() if args.memory_report is not None else None
+    if memory is not None:
+        memory.mark("startup")
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    window = installer_main.ModernGlazedInstaller(
+        args.game_dir, args.limit_rate, args.per_download_rate, args.mirror, None, args.durability, args.base_url,
+        args.prefetch_rate, not args.no_bundle, args.peer, args.discover_peers, args.low_footprint, memory)
+    outcomes = []
+    window.install_finished.connect(outcomes.append)
+    poll = QtCore.QTimer()
+    def check_finished():
+        if not window.is_installing:
+            app.exit(0 if outcomes and outcomes[-1]["installed"] is not None else 1)
+    def start():
+        window.selected_version = args.install
+        window.start_installation()
+        poll.start(50)
+    poll.timeout.connect(check_finished)
+    window.show()
+    QtCore.QTimer.singleShot(0, start)
+    status = app.exec_()
+    installer_main.finish_memory_report(memory, args.memory_report)
+    return status
+
+def rank_mirrors(home: str, urls: List[str]) -> None:
+    stats = {url: {"throughput": 1024.0 ** 3 / (i + 1), "successes": 1, "failures": 0, "last_failure": 0.0,
+                   "last_error": ""} for i, url in enumerate(urls)}
+    with open(os.path.join(home, os.path.basename(MIRROR_HEALTH_FILE)), "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+
+def failed_checks(scenario: Dict, run: Dict) -> List[str]:
+    checks = [f"{key} is {run.get(key) or 0}, expected at least {minimum}"
+              for key, minimum in scenario.get("expect", {}).items() if (run.get(key) or 0) < minimum]
+    checks += [f"{key} is {run.get(key) or 0}, expected at most {maximum}"
+               for key, maximum in scenario.get("expect_at_most", {}).items() if (run.get(key) or 0) > maximum]
+    return checks
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"cache server exited with status {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"cache server did not start listening on port {port}")
+
+def run_peer_install(cdn: FakeCDN, home: str, game_dir: str, minecraft_version: str, extra_args: List[str]) -> Dict:
+    seed_home = os.path.join(home, "seed")
+    seed_game_dir = os.path.join(seed_home, "instance")
+    os.makedirs(seed_game_dir)
+    seeded = run_install(seed_home, seed_game_dir, cdn.url, minecraft_version, extra_args)
+    if seeded["exit_code"] != 0:
+        raise RuntimeError(f"seeding install failed, see {seeded['log']}")
+    seed_jar_requests = cdn.stats["jar_requests"]
+    cdn.reset_stats()
+    port = free_port()
+    serve_log_path = os.path.join(seed_home, "serve.log")
+    env = dict(install_env(seed_home), PYTHONUNBUFFERED="1")
+    with open(serve_log_path, "ab") as serve_log:
+        server = subprocess.Popen([sys.executable, MAIN_SCRIPT, "--serve-cache", "--peer-port", str(port)],
+                                  env=env, stdout=serve_log, stderr=subprocess.STDOUT)
+        try:
+            wait_for_port(port, server)
+            run = run_install(home, game_dir, cdn.url, minecraft_version,
+                              extra_args + ["--peer", f"http://127.0.0.1:{port}"])
+        finally:
+            server.terminate()
+            server.wait()
+    with open(serve_log_path, "r", encoding="utf-8", errors="replace") as f:
+        run["peer_served"] = sum(line.startswith("Served ") for line in f)
+    run["uplink_jar_requests"] = seed_jar_requests + cdn.stats["jar_requests"]
+    return run
+
+def run_scenario(cdn: FakeCDN, name: str, minecraft_version: str, extra_args: List[str], keep_dirs: bool) -> Dict:
+    scenario = SCENARIOS[name]
+    window = scenario.get("window", False)
+    home = tempfile.mkdtemp(prefix=f"glazed-bench-{name}-")
+    game_dir = os.path.join(home, "instance")
+    os.makedirs(game_dir)
+    extra_args = extra_args + scenario.get("args", [])
+    memory_report = os.path.join(home, "memory.json")
+    mirror = None
+    try:
+        if "mirror" in scenario:
+            mirror = FakeCDN(cdn.files, rate=cdn.rate, **scenario["mirror"]).start()
+            rank_mirrors(home, [cdn.url, mirror.url])
+            extra_args = extra_args + ["--mirror", mirror.url]
+        if scenario["prime"]:
+            cdn.configure(**CLEAN_NETWORK)
+            primed = run_install(home, game_dir, cdn.url, minecraft_version, extra_args)
+            if primed["exit_code"] != 0:
+                raise RuntimeError(f"priming install for {name} failed, see {primed['log']}")
+            if not scenario["keep_mods"]:
+                shutil.rmtree(os.path.join(game_dir, "mods"))
+        cdn.configure(**dict(CLEAN_NETWORK, **scenario["network"]))
+        cdn.reset_stats()
+        if name in MEMORY_TARGETS:
+            run = run_install(home, game_dir, cdn.url, minecraft_version, extra_args + ["--memory-report", memory_report],
+                              window)
+            with open(memory_report, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            run["traced_peak_kib"] = report["traced_peak_kib"]
+            run["peak_rss_kib"] = report["peak_rss_kib"] or run["peak_rss_kib"]
+        elif scenario.get("peer"):
+            run = run_peer_install(cdn, home, game_dir, minecraft_version, extra_args)
+        else:
+            run = run_install(home, game_dir, cdn.url, minecraft_version, extra_args, window)
+        run.update(cdn.stats)
+        if mirror is not None:
+            run.update({f"mirror_{key}": value for key, value in mirror.stats.items()})
+        run["failed_checks"] = failed_checks(scenario, run)
+        return run
+    finally:
+        if mirror is not None:
+            mirror.stop()
+        cdn.configure(**CLEAN_NETWORK)
+        if not keep_dirs:
+            shutil.rmtree(home, ignore_errors=True)
+
+def summarize(runs: List[Dict]) -> Dict:
+    def median(key: str) -> Optional[float]:
+        values = [run[key] for run in runs if run.get(key) is not None]
+        return statistics.median(values) if values else None
+    return {
+        "ok": all(run["exit_code"] == 0 and not run["failed_checks"] for run in runs),
+        "seconds": median("seconds"),
+        "cpu_seconds": median("cpu_seconds"),
+        "bytes_sent": median("bytes_sent"),
+        "requests": median("requests"),
+        "peak_rss_kib": median("peak_rss_kib"),
+        "traced_peak_kib": median("traced_peak_kib"),
+        "failed_checks": sorted({check for run in runs for check in run["failed_checks"]}),
+        "runs": runs,
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(MAIN_SCRIPT),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results: Dict) -> None:
+    print(f"{'scenario':<22}{'time':>10}{'cpu':>10}{'sent':>12}{'requests':>10}{'peak RSS':>12}  ok")
+    for name, summary in results["scenarios"].items():
+        cpu = "-" if summary["cpu_seconds"] is None else f"{summary['cpu_seconds']:.2f}s"
+        rss = "-" if summary["peak_rss_kib"] is None else format_bytes(summary["peak_rss_kib"] * 1024)
+        print(f"{name:<22}{summary['seconds']:>9.3f}s{cpu:>10}{format_bytes(summary['bytes_sent']):>12}"
+              f"{summary['requests']:>10.0f}{rss:>12}  {'yes' if summary['ok'] else 'NO'}")
+
+def check_memory_targets(results: Dict) -> List[str]:
+    misses = []
+    for name, targets in MEMORY_TARGETS.items():
+        summary = results["scenarios"].get(name)
+        if not summary:
+            continue
+        for metric, limit in targets.items():
+            value = summary.get(metric)
+            if value is not None and value > limit:
+                misses.append(f"{name}: {metric} {format_bytes(value * 1024)} is over the target of {format_bytes(limit * 1024)}")
+    return misses
+
+def compare_results(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    regressions = []
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} from {baseline.get('created', '?')}:")
+    for name, summary in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), summary.get(metric)
+            if not old or new is None:
+                continue
+            delta = (new - old) / old
+            changes.append(f"{metric} {delta:+.1%}")
+            if delta > threshold:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({delta:+.1%})")
+        print(f"  {name:<22}{', '.join(changes)}")
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="End-to-end install benchmarks against a local fake CDN")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable, default all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the median is reported")
+    parser.add_argument("--minecraft-version", default="1.21.4")
+    parser.add_argument("--size", type=parse_rate, default=4 * 1024 * 1024, metavar="BYTES",
+                        help="size of each generated jar")
+    parser.add_argument("--rate", type=parse_rate, default=0.0, metavar="RATE",
+                        help="fake CDN bandwidth cap per connection")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the injected faults")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="where result JSON files are written")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative increase that counts as a regression when comparing")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary homes and install logs")
+    parser.add_argument("install_args", nargs=argparse.REMAINDER,
+                        help="extra arguments passed to main.py --install after --")
+    return parser.parse_args(argv[1:])
+
+def main():
+    args = parse_args(sys.argv)
+    extra_args = [arg for arg in args.install_args if arg != "--"]
+    names = args.scenario or list(SCENARIOS)
+    files = synthetic_artifacts(int(args.size))
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"size": int(args.size), "rate": args.rate, "repeat": args.repeat, "seed": args.seed,
+                     "minecraft_version": args.minecraft_version, "install_args": extra_args},
+        "scenarios": {},
+    }
+    with FakeCDN(files, rate=args.rate, seed=args.seed) as cdn:
+        for name in names:
+            print(f"Running {name} x{args.repeat}...")
+            runs = [run_scenario(cdn, name, args.minecraft_version, extra_args, args.keep) for _ in range(args.repeat)]
+            results["scenarios"][name] = summarize(runs)
+
+    print()
+    print_results(results)
+    os.makedirs(args.results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    result_path = os.path.join(args.results_dir, f"{stamp}-{results['revision'] or 'local'}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {result_path}")
+
+    failed = [name for name, summary in results["scenarios"].items() if not summary["ok"]]
+    if failed:
+        print(f"Installs failed in: {', '.join(failed)}")
+    for name, summary in results["scenarios"].items():
+        for check in summary["failed_checks"]:
+            print(f"Check failed in {name}: {check}")
+    misses = check_memory_targets(results)
+    for miss in misses:
+        print(f"Memory target missed: {miss}")
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_results(json.load(f), results, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+    sys.exit(1 if failed or misses or regressions else 0)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == [WINDOW_DRIVER_FLAG]:
+        sys.exit(drive_window(sys.argv[2:]))
+    main()
@@ -0,0 +1,261 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import socket
+import hashlib
+import tarfile
+import argparse
+import threading
+import urllib.parse
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from installer_core import BUNDLE_MANIFEST, BUNDLE_PATH, RELEASE_PATHS, VERSION_CHECK_PATH, BASE_URL_ENV, parse_rate
+
+DEFAULT_ARTIFACT_SIZE = 2 * 1024 * 1024
+SEND_CHUNK = 16 * 1024
+CONTENT_TYPES = {".jar": "application/java-archive", ".tar": "application/x-tar"}
+
+def synthetic_artifacts(size: int = DEFAULT_ARTIFACT_SIZE, version: str = "1.0.0", seed: int = 0) -> Dict[str, bytes]:
+    rng = random.Random(seed)
+    files = {VERSION_CHECK_PATH: f"{version}\n".encode()}
+    for paths in RELEASE_PATHS.values():
+        for path in paths.values():
+            files[path] = rng.randbytes(size)
+    return add_bundles(files)
+
+def build_bundle(minecraft_version: str, jars: Dict[str, bytes]) -> bytes:
+    manifest = {
+        "minecraft_version": minecraft_version,
+        "files": {name: {"size": len(body), "sha256": hashlib.sha256(body).hexdigest()} for name, body in jars.items()},
+    }
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for name, body in [(BUNDLE_MANIFEST, json.dumps(manifest, indent=2).encode())] + list(jars.items()):
+            info = tarfile.TarInfo(name)
+            info.size = len(body)
+            tar.addfile(info, io.BytesIO(body))
+    return buffer.getvalue()
+
+def add_bundles(files: Dict[str, bytes]) -> Dict[str, bytes]:
+    for version, paths in RELEASE_PATHS.items():
+        bundle_path = BUNDLE_PATH.format(version=version)
+        if bundle_path in files or not all(path in files for path in paths.values()):
+            continue
+        files[bundle_path] = build_bundle(version, {path.split('/')[-1]: files[path] for path in paths.values()})
+    return files
+
+def load_artifacts(root: str) -> Dict[str, bytes]:
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, root).replace(os.sep, "/")
+            with open(full_path, "rb") as f:
+                files["/" + rel_path] = f.read()
+    return files
+
+class FakeCDN:
+    def __init__(self, files: Dict[str, bytes], host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 rate: float = 0.0, error_rate: float = 0.0, truncate_rate: float = 0.0,
+                 seed: Optional[int] = None, verbose: bool = False, bundles: bool = True):
+        self.files = files
+        self.bundles = bundles
+        self.bundle_paths = {BUNDLE_PATH.format(version=version) for version in RELEASE_PATHS}
+        self.latency = latency
+        self.rate = rate
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.etags = {path: '"' + hashlib.sha1(body).hexdigest()[:16] + '"' for path, body in files.items()}
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+        handler = type("BoundFakeCDNHandler", (FakeCDNHandler,), {"cdn": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **settings) -> None:
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise AttributeError(name)
+            setattr(self, name, value)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats = {"requests": 0, "jar_requests": 0, "bytes_sent": 0, "errors": 0, "truncated": 0,
+                          "not_modified": 0, "partial": 0}
+
+    def count(self, **deltas) -> None:
+        with self.lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+
+    def roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < probability
+
+    def start(self) -> "FakeCDN":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> "FakeCDN":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+class FakeCDNHandler(BaseHTTPRequestHandler):
+    cdn = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.cdn.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def send_empty(self, status: int, **headers) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def respond(self, head: bool) -> None:
+        cdn = self.cdn
+        cdn.count(requests=1)
+        if cdn.latency > 0:
+            time.sleep(cdn.latency)
+        path = urllib.parse.urlsplit(self.path).path
+        if path.endswith(".jar"):
+            cdn.count(jar_requests=1)
+        body = cdn.files.get(path)
+        if body is None or (not cdn.bundles and path in cdn.bundle_paths):
+            self.send_empty(404)
+            return
+        if cdn.roll(cdn.error_rate):
+            cdn.count(errors=1)
+            self.send_empty(503, Retry_After="1")
+            return
+        etag = cdn.etags[path]
+        if self.headers.get("If-None-Match") == etag:
+            cdn.count(not_modified=1)
+            self.send_empty(304, ETag=etag, Last_Modified=cdn.last_modified)
+            return
+
+        start, end = 0, len(body)
+        requested = self.headers.get("Range", "")
+        if requested.startswith("bytes="):
+            first, _, last = requested[len("bytes="):].partition("-")
+            try:
+                start = int(first)
+                end = int(last) + 1 if last else len(body)
+            except ValueError:
+                start, end = 0, len(body)
+            if start >= len(body):
+                self.send_empty(416, Content_Range=f"bytes */{len(body)}")
+                return
+            end = min(end, len(body))
+
+        partial = (start, end) != (0, len(body))
+        self.send_response(206 if partial else 200)
+        self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(path)[1], "text/plain"))
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", cdn.last_modified)
+        if partial:
+            cdn.count(partial=1)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(body)}")
+        self.end_headers()
+        if head:
+            return
+
+        limit = end
+        if cdn.roll(cdn.truncate_rate):
+            cdn.count(truncated=1)
+            limit = start + (end - start) // 2
+            self.close_connection = True
+        payload = memoryview(body)
+        started = time.monotonic()
+        sent = 0
+        try:
+            for offset in range(start, limit, SEND_CHUNK):
+                piece = payload[offset:min(offset + SEND_CHUNK, limit)]
+                self.wfile.write(piece)
+                sent += len(piece)
+                cdn.count(bytes_sent=len(piece))
+                if cdn.rate > 0:
+                    delay = sent / cdn.rate - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, socket.timeout):
+            self.close_connection = True
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Glazed Client release server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--root", metavar="DIR",
+                        help="serve this directory instead of generated jars (paths as on the real server)")
+    parser.add_argument("--size", type=parse_rate, default=float(DEFAULT_ARTIFACT_SIZE), metavar="BYTES",
+                        help="size of each generated jar, e.g. 512k or 8M")
+    parser.add_argument("--release", default="1.0.0", help="version string served in VERSION.txt")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS",
+                        help="delay before every response")
+    parser.add_argument("--rate", type=parse_rate, default=0.0, metavar="RATE",
+                        help="bandwidth cap per connection, e.g. 500k")
+    parser.add_argument("--error-rate", type=float, default=0.0, metavar="P",
+                        help="probability of answering 503 instead of serving")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, metavar="P",
+                        help="probability of closing the connection halfway through a body")
+    parser.add_argument("--seed", type=int, help="seed for the fault injection")
+    parser.add_argument("--no-bundles", action="store_true",
+                        help="answer 404 for the per-version bundles so clients fall back to single files")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    return parser.parse_args(argv[1:])
+
+def main():
+    args = parse_args(sys.argv)
+    files = add_bundles(load_artifacts(args.root)) if args.root else synthetic_artifacts(int(args.size), args.release)
+    cdn = FakeCDN(files, args.host, args.port, args.latency, args.rate, args.error_rate, args.truncate_rate,
+                  args.seed, args.verbose, not args.no_bundles)
+    print(f"Serving {len(files)} files on {cdn.url}")
+    print(f"Point the installer at it with {BASE_URL_ENV}={cdn.url} or --base-url {cdn.url}")
+    try:
+        cdn.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cdn.server.server_close()
+        print(f"Stats: {cdn.stats}")
+
+if __name__ == "__main__":
+    main()
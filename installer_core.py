@@ -0,0 +1,2375 @@
+import io
+import sys
+import os
+import re
+import json
+import shutil
+import uuid
+import errno
+import hashlib
+import tarfile
+import zipfile
+import functools
+import statistics
+import threading
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+import socket
+import http.client
+import urllib.request
+import urllib.error
+import urllib.parse
+import time
+import random
+
+DEFAULT_BASE_URL = "https://glazedclient.com"
+BASE_URL_ENV = "GLAZED_BASE_URL"
+VERSION_CHECK_PATH = "/VERSION.txt"
+RELEASE_PATHS = {
+    "1.21.4": {
+        "meteor-client": "/1.21.4/meteor-client-1.21.4-42.jar",
+        "baritone": "/1.21.4/baritone-meteor-1.21.4.jar",
+        "glazed": "/szpuszi/glazed-1.21.4.jar"
+    },
+    "1.21.5": {
+        "meteor-client": "/1.21.5/meteor-client-1.21.5-54.jar",
+        "baritone": "/1.21.5/baritone-meteor-1.21.5.jar",
+        "glazed": "/szpuszi/glazed-1.21.5.jar"
+    }
+}
+BUNDLE_PATH = "/bundles/glazed-{version}.tar"
+BUNDLE_MANIFEST = "manifest.json"
+CURRENT_VERSION = "1.0.0"
+
+def version_check_url(base_url: str) -> str:
+    return base_url.rstrip('/') + VERSION_CHECK_PATH
+
+def download_urls_for(base_url: str) -> Dict[str, Dict[str, str]]:
+    base_url = base_url.rstrip('/')
+    return {version: {file_type: base_url + path for file_type, path in paths.items()}
+            for version, paths in RELEASE_PATHS.items()}
+
+def bundle_url_for(base_url: str, minecraft_version: str) -> str:
+    return base_url.rstrip('/') + BUNDLE_PATH.format(version=minecraft_version)
+
+BASE_URL = os.getenv(BASE_URL_ENV) or DEFAULT_BASE_URL
+VERSION_CHECK_URL = version_check_url(BASE_URL)
+DOWNLOAD_URLS = download_urls_for(BASE_URL)
+GLAZED_1_21_4_URL = DOWNLOAD_URLS["1.21.4"]["glazed"]
+GLAZED_1_21_5_URL = DOWNLOAD_URLS["1.21.5"]["glazed"]
+REQUIRED_FILES = ["meteor-client", "baritone", "glazed"]
+MANAGED_MOD_IDS = {"meteor-client": "meteor-client", "baritone": "baritone", "glazed": "glazed"}
+LEGACY_MOD_FILES = [
+    "baritone-meteor-1.21.4.jar",
+    "glazed-1.21.4.jar",
+    "meteor-client-1.21.4-42.jar",
+    "baritone-meteor-1.21.5.jar",
+    "glazed-1.21.5.jar",
+    "meteor-client-1.21.5-54.jar",
+]
+
+VERSION_FILE = os.path.join(os.path.expanduser("~"), ".glazed_version.txt")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".glazed_cache")
+TELEMETRY_FILE = os.path.join(os.path.expanduser("~"), ".glazed_telemetry.jsonl")
+GAME_DIRS_ENV = "GLAZED_GAME_DIRS"
+LIMIT_RATE_ENV = "GLAZED_LIMIT_RATE"
+MIRRORS_ENV = "GLAZED_MIRRORS"
+PEERS_ENV = "GLAZED_PEERS"
+MIRROR_HEALTH_FILE = os.path.join(os.path.expanduser("~"), ".glazed_mirrors.json")
+MOD_INDEX_FILE = os.path.join(os.path.expanduser("~"), ".glazed_mod_index.json")
+PROBE_TIMEOUT = 2.0
+PROBE_TTL = 60.0
+FAILURE_COOLDOWN = 600.0
+MIN_THROUGHPUT_SAMPLE = 64 * 1024
+
+RETRYABLE_HTTP_CODES = {408, 425, 429}
+RETRYABLE_ERRNOS = {errno.ETIMEDOUT, errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTUNREACH, errno.ECONNABORTED}
+DISK_ERRNOS = {errno.ENOSPC, errno.EROFS, errno.EACCES, errno.EPERM, getattr(errno, "EDQUOT", errno.ENOSPC)}
+
+MIN_CHUNK_SIZE = 8192
+MAX_CHUNK_SIZE = 1024 * 1024
+CHUNK_TARGET_SECONDS = 0.1
+PROGRESS_INTERVAL = 0.1
+MAX_PARALLEL_DOWNLOADS = 3
+LOW_FOOTPRINT_BUFFER_SIZE = 64 * 1024
+MEMORY_REPORT_TOP = 10
+PREFETCH_RATE_ENV = "GLAZED_PREFETCH_RATE"
+DEFAULT_PREFETCH_RATE = 1024 * 1024
+PREFETCH_FRESHNESS = 600.0
+PEER_PORT = 47600
+PEER_DISCOVERY_PORT = 47601
+PEER_DISCOVERY_MAGIC = b"glazed-peer?"
+PEER_DISCOVERY_TIMEOUT = 0.5
+PEER_TIMEOUT = 5.0
+MANIFEST_PROBE_BYTES = 64 * 1024
+
+DURABILITY_NONE = "none"
+DURABILITY_COMMIT = "commit"
+DURABILITY_POLICIES = (DURABILITY_NONE, DURABILITY_COMMIT)
+
+MINECRAFT_VERSION_RE = re.compile(r"(\d+\.\d+(?:\.\d+)?)$")
+RATE_RE = re.compile(r"^([\d.]+)\s*([kmg]?)(?:i?b)?(?:/s|ps)?$")
+
+def default_minecraft_dir() -> Optional[str]:
+    if sys.platform.startswith("win"):
+        appdata = os.getenv('APPDATA')
+        if not appdata:
+            return None
+        return os.path.join(appdata, '.minecraft')
+    home = os.path.expanduser("~")
+    if sys.platform == "darwin":
+        return os.path.join(home, "Library", "Application Support", "minecraft")
+    return os.path.join(home, ".minecraft")
+
+def launcher_data_dirs() -> List[Tuple[str, str]]:
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        appdata = os.getenv('APPDATA')
+        if not appdata:
+            return []
+        return [
+            ("Prism Launcher", os.path.join(appdata, "PrismLauncher")),
+            ("PolyMC", os.path.join(appdata, "PolyMC")),
+            ("MultiMC", os.path.join(home, "MultiMC")),
+        ]
+    if sys.platform == "darwin":
+        support = os.path.join(home, "Library", "Application Support")
+        return [
+            ("Prism Launcher", os.path.join(support, "PrismLauncher")),
+            ("PolyMC", os.path.join(support, "PolyMC")),
+            ("MultiMC", os.path.join(support, "MultiMC")),
+        ]
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    flatpak = os.path.join(home, ".var", "app")
+    return [
+        ("Prism Launcher", os.path.join(data_home, "PrismLauncher")),
+        ("Prism Launcher", os.path.join(flatpak, "org.prismlauncher.PrismLauncher", "data", "PrismLauncher")),
+        ("PolyMC", os.path.join(data_home, "PolyMC")),
+        ("MultiMC", os.path.join(data_home, "multimc")),
+        ("MultiMC", os.path.join(home, "MultiMC")),
+    ]
+
+def parse_minecraft_version(version_id: str) -> str:
+    match = MINECRAFT_VERSION_RE.search(version_id or "")
+    return match.group(1) if match else ""
+
+def read_ini_values(path: str) -> Dict[str, str]:
+    values = {}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                key, sep, value = line.partition('=')
+                if sep:
+                    values[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+def read_json_file(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def make_instance(name: str, launcher: str, game_dir: str, minecraft_version: str) -> Dict[str, str]:
+    return {
+        "name": name,
+        "launcher": launcher,
+        "game_dir": game_dir,
+        "mods_path": os.path.join(game_dir, 'mods'),
+        "minecraft_version": minecraft_version,
+    }
+
+def discover_vanilla_instances() -> List[Dict[str, str]]:
+    minecraft_dir = default_minecraft_dir()
+    if not minecraft_dir or not os.path.isdir(minecraft_dir):
+        return []
+    profiles = read_json_file(os.path.join(minecraft_dir, "launcher_profiles.json")) or {}
+    by_dir = {}
+    for profile in (profiles.get("profiles") or {}).values():
+        game_dir = profile.get("gameDir") or minecraft_dir
+        entry = by_dir.setdefault(os.path.normpath(game_dir), [])
+        entry.append(profile)
+    by_dir.setdefault(os.path.normpath(minecraft_dir), [])
+
+    instances = []
+    for game_dir, dir_profiles in by_dir.items():
+        dir_profiles.sort(key=lambda p: p.get("lastUsed", ""), reverse=True)
+        version = ""
+        for profile in dir_profiles:
+            version = parse_minecraft_version(profile.get("lastVersionId", ""))
+            if version:
+                break
+        if game_dir == os.path.normpath(minecraft_dir):
+            name = "Minecraft"
+        else:
+            name = dir_profiles[0].get("name") or os.path.basename(game_dir)
+        instances.append(make_instance(name, "Minecraft Launcher", game_dir, version))
+    return instances
+
+def read_mmc_instance(instance_dir: str, launcher: str) -> Optional[Dict[str, str]]:
+    cfg_path = os.path.join(instance_dir, "instance.cfg")
+    if not os.path.isfile(cfg_path):
+        return None
+    cfg = read_ini_values(cfg_path)
+    version = ""
+    pack = read_json_file(os.path.join(instance_dir, "mmc-pack.json")) or {}
+    for component in pack.get("components", []):
+        if component.get("uid") == "net.minecraft":
+            version = component.get("version", "")
+            break
+    if not version:
+        version = cfg.get("IntendedVersion", "")
+    game_dir = os.path.join(instance_dir, ".minecraft")
+    if not os.path.isdir(game_dir) and os.path.isdir(os.path.join(instance_dir, "minecraft")):
+        game_dir = os.path.join(instance_dir, "minecraft")
+    name = cfg.get("name") or os.path.basename(instance_dir)
+    return make_instance(name, launcher, game_dir, version)
+
+def discover_launcher_instances() -> List[Dict[str, str]]:
+    instances = []
+    for launcher, data_dir in launcher_data_dirs():
+        if not os.path.isdir(data_dir):
+            continue
+        settings = {}
+        for cfg_name in ("prismlauncher.cfg", "polymc.cfg", "multimc.cfg"):
+            settings.update(read_ini_values(os.path.join(data_dir, cfg_name)))
+        instances_dir = settings.get("InstanceDir") or "instances"
+        if not os.path.isabs(instances_dir):
+            instances_dir = os.path.join(data_dir, instances_dir)
+        try:
+            entries = sorted(os.listdir(instances_dir))
+        except OSError:
+            continue
+        for entry in entries:
+            instance = read_mmc_instance(os.path.join(instances_dir, entry), launcher)
+            if instance:
+                instances.append(instance)
+    return instances
+
+def custom_game_dirs(extra_dirs: List[str]) -> List[str]:
+    dirs = list(extra_dirs)
+    env_dirs = os.getenv(GAME_DIRS_ENV)
+    if env_dirs:
+        dirs.extend(d for d in env_dirs.split(os.pathsep) if d)
+    return [os.path.abspath(os.path.expanduser(game_dir)) for game_dir in dirs]
+
+def discover_custom_instances(extra_dirs: List[str]) -> List[Dict[str, str]]:
+    return [make_instance(os.path.basename(game_dir) or game_dir, "Custom", game_dir, "")
+            for game_dir in custom_game_dirs(extra_dirs) if os.path.isdir(game_dir)]
+
+def discover_minecraft_instances(extra_dirs: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    found = discover_vanilla_instances() + discover_launcher_instances() + discover_custom_instances(extra_dirs or [])
+    instances = []
+    seen = set()
+    for instance in found:
+        key = os.path.normcase(os.path.realpath(instance["mods_path"]))
+        if key in seen:
+            continue
+        seen.add(key)
+        instances.append(instance)
+    return instances
+
+def fsync_path(path: str) -> None:
+    with open(path, 'r+b') as f:
+        os.fsync(f.fileno())
+
+def fsync_dir(path: str) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def commit_file(tmp_path: str, dst: str, durability: str = DURABILITY_NONE) -> None:
+    if durability == DURABILITY_COMMIT:
+        fsync_path(tmp_path)
+    os.replace(tmp_path, dst)
+    if durability == DURABILITY_COMMIT:
+        fsync_dir(os.path.dirname(os.path.abspath(dst)))
+
+def link_or_copy(src: str, dst: str, durability: str = DURABILITY_NONE) -> None:
+    tmp_path = dst + ".glazed-tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    commit_file(tmp_path, dst, durability)
+
+def preallocate(fd: int, offset: int, length: int) -> bool:
+    if length <= 0 or not hasattr(os, "posix_fallocate"):
+        return False
+    try:
+        os.posix_fallocate(fd, offset, length)
+        return True
+    except OSError:
+        return False
+
+_stream_buffers = threading.local()
+
+def stream_buffer(size: int = MAX_CHUNK_SIZE) -> memoryview:
+    buffer = getattr(_stream_buffers, "view", None)
+    if buffer is None or len(buffer) < size:
+        buffer = memoryview(bytearray(size))
+        _stream_buffers.view = buffer
+    return buffer[:size]
+
+class InstallCancelled(Exception):
+    pass
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._responses = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            responses = list(self._responses)
+        for resp in responses:
+            close_response(resp)
+
+    def check(self):
+        if self._event.is_set():
+            raise InstallCancelled()
+
+    def sleep(self, seconds: float):
+        if self._event.wait(seconds):
+            raise InstallCancelled()
+
+    def register(self, resp):
+        with self._lock:
+            self._responses.add(resp)
+        if self.cancelled:
+            close_response(resp)
+
+    def unregister(self, resp):
+        with self._lock:
+            self._responses.discard(resp)
+
+def close_response(resp) -> None:
+    sock = getattr(getattr(resp, "fp", None), "raw", None)
+    sock = getattr(sock, "_sock", None)
+    try:
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        resp.close()
+    except Exception:
+        pass
+
+def parse_rate(text: Optional[str]) -> float:
+    if not text:
+        return 0.0
+    match = RATE_RE.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"invalid rate: {text!r}")
+    multipliers = {"": 1, "k": 1024, "m": 1024 * 1024, "g": 1024 * 1024 * 1024}
+    return float(match.group(1)) * multipliers[match.group(2)]
+
+def format_rate(rate: float) -> str:
+    if rate >= 1024 * 1024:
+        return f"{rate / (1024 * 1024):.1f} MiB/s"
+    return f"{rate / 1024:.1f} KiB/s"
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(rate / 4, MIN_CHUNK_SIZE)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.streams = 0
+        self.consumed = 0
+        self._waiters = deque()
+        self._cond = threading.Condition()
+
+    @property
+    def limited(self) -> bool:
+        return self.rate > 0
+
+    def register(self):
+        with self._cond:
+            self.streams += 1
+
+    def unregister(self):
+        with self._cond:
+            self.streams = max(0, self.streams - 1)
+
+    def fair_share(self) -> int:
+        if not self.limited:
+            return MAX_CHUNK_SIZE
+        return max(MIN_CHUNK_SIZE, int(self.capacity / max(1, self.streams)))
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def consume(self, amount: int, cancel: Optional[CancelToken] = None):
+        if not self.limited:
+            self.consumed += amount
+            return
+        amount = min(amount, self.capacity)
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    if cancel:
+                        cancel.check()
+                    if not self.limited:
+                        self.consumed += amount
+                        return
+                    self._refill()
+                    is_next = self._waiters[0] is ticket
+                    if is_next and self.tokens >= amount:
+                        self.tokens -= amount
+                        self.consumed += amount
+                        return
+                    timeout = (amount - self.tokens) / self.rate if is_next else None
+                    if cancel:
+                        timeout = min(timeout or 0.1, 0.1)
+                    self._cond.wait(timeout)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def set_rate(self, rate: float):
+        with self._cond:
+            self._refill()
+            self.rate = rate
+            self.capacity = max(rate / 4, MIN_CHUNK_SIZE)
+            self.tokens = min(self.tokens, self.capacity)
+            self._cond.notify_all()
+
+    def describe(self) -> str:
+        if not self.limited:
+            return "unlimited"
+        return f"limit {format_rate(self.rate)} shared by {self.streams} stream(s)"
+
+class ChunkSizer:
+    def __init__(self, limiters: List[TokenBucket], max_size: int = MAX_CHUNK_SIZE):
+        self.limiters = limiters
+        self.max_size = max_size
+        self.size = min(MIN_CHUNK_SIZE, max_size)
+        self.window_bytes = 0
+        self.window_start = time.monotonic()
+
+    def next_size(self) -> int:
+        cap = min([self.max_size] + [limiter.fair_share() for limiter in self.limiters])
+        return max(min(MIN_CHUNK_SIZE, self.max_size), min(self.size, cap))
+
+    def record(self, nbytes: int):
+        self.window_bytes += nbytes
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed < CHUNK_TARGET_SECONDS * 2:
+            return
+        target = int(self.window_bytes / elapsed * CHUNK_TARGET_SECONDS) // 4096 * 4096
+        self.size = max(min(MIN_CHUNK_SIZE, self.max_size), min(self.max_size, self.size * 2, target))
+        self.window_bytes = 0
+        self.window_start = now
+
+def stream_to_file(resp, file_path: str, limiters: Optional[List[TokenBucket]] = None, on_bytes=None,
+                   append: bool = False, cancel: Optional[CancelToken] = None, hasher=None,
+                   buffer_size: int = MAX_CHUNK_SIZE) -> int:
+    limiters = [limiter for limiter in (limiters or []) if limiter is not None]
+    sizer = ChunkSizer(limiters, buffer_size)
+    buffer = stream_buffer(buffer_size)
+    expected = getattr(resp, "length", None)
+    total = 0
+    for limiter in limiters:
+        limiter.register()
+    try:
+        with open(file_path, 'r+b' if append else 'wb', buffering=0) as file:
+            start = file.seek(0, os.SEEK_END)
+            preallocated = expected is not None and preallocate(file.fileno(), start, expected)
+            try:
+                while True:
+                    if cancel:
+                        cancel.check()
+                    n = resp.readinto(buffer[:sizer.next_size()])
+                    if not n:
+                        break
+                    view = buffer[:n]
+                    if hasher:
+                        hasher.update(view)
+                    while view:
+                        view = view[file.write(view):]
+                    total += n
+                    for limiter in limiters:
+                        limiter.consume(n, cancel)
+                    sizer.record(n)
+                    if on_bytes:
+                        on_bytes(n)
+                if cancel:
+                    cancel.check()
+                if expected is not None and total < expected:
+                    raise http.client.IncompleteRead(b"", expected - total)
+            except BaseException:
+                if preallocated:
+                    file.truncate(start + total)
+                raise
+    finally:
+        for limiter in limiters:
+            limiter.unregister()
+    return total
+
+def mirror_of(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def mirror_urls(url: str, mirrors: List[str]) -> List[str]:
+    parts = urllib.parse.urlsplit(url)
+    path = urllib.parse.urlunsplit(("", "", parts.path, parts.query, ""))
+    urls = [url]
+    for mirror in mirrors:
+        mirror_url = mirror.rstrip('/') + path
+        if mirror_url not in urls:
+            urls.append(mirror_url)
+    return urls
+
+def probe_latency(mirror: str, timeout: float = PROBE_TIMEOUT) -> Optional[float]:
+    parts = urllib.parse.urlsplit(mirror)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    started = time.perf_counter()
+    try:
+        socket.create_connection((parts.hostname, port), timeout=timeout).close()
+    except OSError:
+        return None
+    return time.perf_counter() - started
+
+def content_range_start(resp) -> Optional[int]:
+    match = re.match(r"bytes (\d+)-", resp.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+class MirrorHealth:
+    def __init__(self, path: Optional[str] = MIRROR_HEALTH_FILE, on_status=print):
+        self.path = path
+        self.on_status = on_status
+        self.stats = (read_json_file(path) if path else None) or {}
+        self._probes = {}
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+
+    def _entry(self, mirror: str) -> Dict:
+        return self.stats.setdefault(mirror, {
+            "throughput": 0.0, "successes": 0, "failures": 0, "last_failure": 0.0, "last_error": "",
+        })
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.stats, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.on_status(f"Warning: could not save mirror health: {e}")
+
+    def record_success(self, mirror: str, nbytes: int, seconds: float):
+        with self._lock:
+            entry = self._entry(mirror)
+            if nbytes >= MIN_THROUGHPUT_SAMPLE and seconds > 0:
+                sample = nbytes / seconds
+                entry["throughput"] = sample if not entry["throughput"] else entry["throughput"] * 0.7 + sample * 0.3
+            entry["successes"] += 1
+            entry["failures"] = 0
+            self._save()
+
+    def record_failure(self, mirror: str, error: Exception):
+        with self._lock:
+            entry = self._entry(mirror)
+            entry["failures"] += 1
+            entry["last_failure"] = time.time()
+            entry["last_error"] = str(error)[:200]
+            self._save()
+        self.on_status(f"Mirror {mirror} failed: {error}")
+
+    def recently_failed(self, mirror: str) -> bool:
+        entry = self.stats.get(mirror)
+        return bool(entry and entry["failures"] and time.time() - entry["last_failure"] < FAILURE_COOLDOWN)
+
+    def latencies(self, mirrors: List[str]) -> Dict[str, Optional[float]]:
+        with self._probe_lock:
+            now = time.monotonic()
+            stale = [m for m in mirrors if m not in self._probes or now - self._probes[m][1] >= PROBE_TTL]
+            if stale:
+                with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+                    for mirror, latency in zip(stale, pool.map(probe_latency, stale)):
+                        self._probes[mirror] = (latency, time.monotonic())
+            return {m: self._probes[m][0] for m in mirrors}
+
+    def rank(self, urls: List[str]) -> List[str]:
+        if len(urls) <= 1:
+            return list(urls)
+        mirrors = [mirror_of(url) for url in urls]
+        throughputs = [self.stats.get(m, {}).get("throughput", 0.0) for m in mirrors]
+        if all(throughputs):
+            keys = [(self.recently_failed(m), -t) for m, t in zip(mirrors, throughputs)]
+        else:
+            latencies = self.latencies(mirrors)
+            keys = [(self.recently_failed(m), latencies[m] is None, latencies[m] or 0.0) for m in mirrors]
+        order = sorted(range(len(urls)), key=lambda i: keys[i])
+        return [urls[i] for i in order]
+
+def is_disk_error(error: BaseException) -> bool:
+    return (isinstance(error, OSError) and not isinstance(error, urllib.error.URLError)
+            and error.errno in DISK_ERRNOS)
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_HTTP_CODES or error.code >= 500
+    if isinstance(error, urllib.error.URLError):
+        reason = error.reason
+        return isinstance(reason, BaseException) and is_retryable_error(reason)
+    if isinstance(error, socket.gaierror):
+        return error.errno == socket.EAI_AGAIN
+    if isinstance(error, (socket.timeout, TimeoutError, ConnectionError, http.client.IncompleteRead,
+                          http.client.BadStatusLine)):
+        return True
+    if isinstance(error, OSError):
+        return error.errno in RETRYABLE_ERRNOS
+    return False
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 8.0,
+                 budget: float = 90.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def next_delay(self, attempt: int, started: float) -> Optional[float]:
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() - started + delay > self.budget:
+            return None
+        return delay
+
+    def run(self, operation, on_retry=None, label: str = "request", cancel: Optional[CancelToken] = None,
+            on_status=print):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except Exception as e:
+                if cancel and cancel.cancelled:
+                    raise InstallCancelled() from e
+                attempt += 1
+                delay = self.next_delay(attempt, started) if is_retryable_error(e) else None
+                if delay is None:
+                    raise
+                on_status(f"Retrying {label} in {delay:.1f}s (attempt {attempt + 1}/{self.max_attempts}): {e}")
+                if on_retry:
+                    on_retry(attempt, e, delay)
+                if cancel:
+                    cancel.sleep(delay)
+                else:
+                    time.sleep(delay)
+
+class TimedConnectionMixin:
+    def __init__(self, *args, timings: Optional[Dict[str, float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = timings if timings is not None else {}
+        self._create_connection = self._timed_create_connection
+
+    def _timed_create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+        host, port = address
+        started = time.perf_counter()
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        self.timings["dns"] = resolved - started
+        last_error = None
+        for _, _, _, _, sockaddr in infos:
+            try:
+                sock = socket.create_connection(sockaddr[:2], timeout, source_address)
+            except OSError as e:
+                last_error = e
+                continue
+            self.timings["connect"] = time.perf_counter() - resolved
+            return sock
+        raise last_error or OSError(f"cannot resolve {host}")
+
+class TimedHTTPConnection(TimedConnectionMixin, http.client.HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnectionMixin, http.client.HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - started
+        self.timings["tls"] = max(0.0, elapsed - self.timings.get("dns", 0.0) - self.timings.get("connect", 0.0))
+
+class TimedHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(functools.partial(TimedHTTPConnection, timings=getattr(req, "timings", None)), req)
+
+class TimedHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(functools.partial(TimedHTTPSConnection, timings=getattr(req, "timings", None)), req,
+                            context=self._context)
+
+TIMED_OPENER = urllib.request.build_opener(TimedHTTPHandler, TimedHTTPSHandler)
+
+def open_timed(request: urllib.request.Request, timeout: float, cancel: Optional[CancelToken] = None):
+    request.timings = {}
+    started = time.perf_counter()
+    if cancel:
+        cancel.check()
+    resp = TIMED_OPENER.open(request, timeout=timeout)
+    if cancel:
+        cancel.register(resp)
+    elapsed = time.perf_counter() - started
+    timings = request.timings
+    timings["ttfb"] = max(0.0, elapsed - timings.get("dns", 0.0) - timings.get("connect", 0.0) - timings.get("tls", 0.0))
+    return resp, timings
+
+class TelemetryLog:
+    def __init__(self, path: Optional[str] = TELEMETRY_FILE, on_status=print):
+        self.path = path
+        self.on_status = on_status
+        self.session = uuid.uuid4().hex[:12]
+        self.machine = socket.gethostname()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        if not self.path:
+            return
+        record = {"ts": round(time.time(), 3), "session": self.session, "machine": self.machine, "event": event}
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                self.on_status(f"Warning: could not write telemetry: {e}")
+
+def summarize(values: List[float]) -> str:
+    if not values:
+        return "-"
+    return f"avg {statistics.mean(values) * 1000:.0f} ms, p50 {statistics.median(values) * 1000:.0f} ms"
+
+def print_telemetry_report(path: str = TELEMETRY_FILE) -> None:
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        print(f"No telemetry found at {path}")
+        return
+    artifacts = [r for r in records if r.get("event") == "artifact"]
+    installs = [r for r in records if r.get("event") == "install_end"]
+    sessions = {r.get("session") for r in records}
+    machines = {r.get("machine") for r in records}
+    print(f"Telemetry: {path}")
+    print(f"  {len(sessions)} session(s) on {len(machines)} machine(s), {len(installs)} install(s), {len(artifacts)} artifact fetch(es)")
+    if installs:
+        durations = [r["duration"] for r in installs if "duration" in r]
+        succeeded = sum(1 for r in installs if r.get("ok"))
+        print(f"  Installs: {succeeded}/{len(installs)} succeeded, duration {summarize(durations)}")
+    stalls = [r for r in records if r.get("event") == "stall"]
+    if stalls:
+        blocked = {}
+        for r in stalls:
+            blocked.setdefault(r.get("where", "?"), []).append(r.get("duration", 0.0))
+        print(f"  Event loop stalls: {len(stalls)}, {sum(map(sum, blocked.values())) * 1000:.0f} ms blocked")
+        for where, durations in sorted(blocked.items(), key=lambda item: sum(item[1]), reverse=True)[:5]:
+            print(f"  {sum(durations) * 1000:>8.0f} ms  {len(durations)}x, worst {max(durations) * 1000:.0f} ms  {where}")
+    if not artifacts:
+        return
+    fetched = [r for r in artifacts if r.get("cache") == "miss" and r.get("ok")]
+    hits = sum(1 for r in artifacts if r.get("cache") == "hit")
+    failed = sum(1 for r in artifacts if not r.get("ok"))
+    total_bytes = sum(r.get("bytes", 0) for r in artifacts)
+    print(f"  Cache: {hits} hit(s), {len(fetched)} miss(es), {failed} failure(s); {total_bytes / (1024 * 1024):.1f} MiB transferred")
+    print(f"  Retries: {sum(r.get('retries', 0) for r in artifacts)}")
+    for phase in ("dns", "connect", "tls", "ttfb", "transfer", "commit"):
+        values = [r[phase] for r in artifacts if r.get(phase) is not None]
+        print(f"  {phase:>8}: {summarize(values)}")
+    by_mirror = {}
+    for r in fetched:
+        by_mirror.setdefault(r.get("mirror", "?"), []).append(r)
+    for mirror, rows in sorted(by_mirror.items()):
+        rates = [r["throughput"] for r in rows if r.get("throughput")]
+        rate = format_rate(statistics.median(rates)) if rates else "-"
+        print(f"  {mirror}: {len(rows)} download(s), median {rate}")
+
+def format_bytes(size: float) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MiB"
+    return f"{size / 1024:.0f} KiB"
+
+def peak_rss_kib() -> Optional[int]:
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+class MemoryProfiler:
+    def __init__(self, top: int = MEMORY_REPORT_TOP):
+        self.top = top
+        self.lock = threading.Lock()
+        self.marks = []
+        self.baseline = None
+        self.latest = None
+        self.started = time.monotonic()
+        tracemalloc.start()
+
+    def mark(self, label: str) -> Dict:
+        with self.lock:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            if self.baseline is None:
+                self.baseline = snapshot
+            self.latest = snapshot
+            record = {"label": label, "time": round(time.monotonic() - self.started, 3),
+                      "traced_kib": current // 1024, "traced_peak_kib": peak // 1024, "peak_rss_kib": peak_rss_kib()}
+            self.marks.append(record)
+        return record
+
+    def report(self) -> Dict:
+        with self.lock:
+            growth = self.latest.compare_to(self.baseline, "lineno")[:self.top] if self.latest else []
+            return {
+                "marks": list(self.marks),
+                "traced_peak_kib": max((mark["traced_peak_kib"] for mark in self.marks), default=0),
+                "peak_rss_kib": peak_rss_kib(),
+                "growth": [{"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                            "size_kib": stat.size // 1024, "size_diff_kib": stat.size_diff // 1024} for stat in growth],
+            }
+
+    def write(self, path: str) -> Dict:
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def stop(self):
+        tracemalloc.stop()
+
+def print_memory_report(report: Dict) -> None:
+    print("Memory:")
+    print(f"  {'mark':<20}{'time':>9}{'traced':>12}{'peak since last':>18}{'peak RSS':>12}")
+    for mark in report["marks"]:
+        rss = "-" if mark["peak_rss_kib"] is None else format_bytes(mark["peak_rss_kib"] * 1024)
+        print(f"  {mark['label']:<20}{mark['time']:>8.2f}s{format_bytes(mark['traced_kib'] * 1024):>12}"
+              f"{format_bytes(mark['traced_peak_kib'] * 1024):>18}{rss:>12}")
+    if report["growth"]:
+        print("  Largest growth since the first mark:")
+        for stat in report["growth"]:
+            print(f"  {stat['size_diff_kib']:>+8} KiB  {stat['where']}")
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds + 0.5)
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class ProgressModel:
+    def __init__(self, on_update=None, limiter: Optional[TokenBucket] = None,
+                 interval: float = PROGRESS_INTERVAL, smoothing: float = 0.3):
+        self.on_update = on_update
+        self.limiter = limiter
+        self.interval = interval
+        self.smoothing = smoothing
+        self.artifacts = {}
+        self.retries = 0
+        self.rate = 0.0
+        self._sampled_bytes = 0
+        self._sampled_at = time.monotonic()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, artifact: str, total: int = 0):
+        with self._lock:
+            self.artifacts[artifact] = [0, total]
+
+    def begin(self, artifact: str, done: int, total: int):
+        with self._lock:
+            self.artifacts[artifact] = [done, max(total, done)]
+        self._maybe_emit()
+
+    def advance(self, artifact: str, nbytes: int):
+        with self._lock:
+            entry = self.artifacts.setdefault(artifact, [0, 0])
+            entry[0] += nbytes
+            if entry[1] and entry[0] > entry[1]:
+                entry[1] = entry[0]
+        self._maybe_emit()
+
+    def finish(self, artifact: str, size: int = 0):
+        with self._lock:
+            entry = self.artifacts.setdefault(artifact, [0, 0])
+            entry[1] = max(entry[1], entry[0], size)
+            entry[0] = entry[1]
+        self._maybe_emit(force=True)
+
+    def note_retry(self, *args):
+        with self._lock:
+            self.retries += 1
+        self._maybe_emit(force=True)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            artifacts = {name: tuple(entry) for name, entry in self.artifacts.items()}
+            retries = self.retries
+            rate = self.rate
+        done = sum(d for d, _ in artifacts.values())
+        total = sum(t for _, t in artifacts.values())
+        if total and all(t for _, t in artifacts.values()):
+            fraction = done / total
+        elif artifacts:
+            fraction = sum((d / t) if t else 0.0 for d, t in artifacts.values()) / len(artifacts)
+        else:
+            fraction = 0.0
+        eta = (total - done) / rate if rate > 0 and total >= done else None
+        return {
+            "artifacts": artifacts,
+            "done": done,
+            "total": total,
+            "fraction": min(1.0, fraction),
+            "rate": rate,
+            "eta": eta,
+            "retries": retries,
+            "limiter": self.limiter.describe() if self.limiter else "unlimited",
+        }
+
+    def _maybe_emit(self, force: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.interval:
+                return
+            done = sum(entry[0] for entry in self.artifacts.values())
+            elapsed = now - self._sampled_at
+            if elapsed >= self.interval / 2:
+                sample = max(0, done - self._sampled_bytes) / elapsed
+                self.rate = sample if not self.rate else self.rate * (1 - self.smoothing) + sample * self.smoothing
+                self._sampled_bytes = done
+                self._sampled_at = now
+            self._last_emit = now
+        if self.on_update:
+            self.on_update(self.snapshot())
+
+    def flush(self):
+        self._maybe_emit(force=True)
+
+def describe_progress(snapshot: Dict) -> str:
+    parts = []
+    for name, (done, total) in snapshot["artifacts"].items():
+        percent = f"{done * 100 // total}%" if total else format_bytes(done)
+        parts.append(f"{name} {percent}")
+    overall = f"Overall {format_bytes(snapshot['done'])}"
+    if snapshot["total"]:
+        overall += f" / {format_bytes(snapshot['total'])}"
+    overall += f" · {format_rate(snapshot['rate'])} · ETA {format_eta(snapshot['eta'])}"
+    if snapshot["retries"]:
+        overall += f" · {snapshot['retries']} retries"
+    if snapshot["limiter"] != "unlimited":
+        overall += f" · {snapshot['limiter']}"
+    return "\n".join(parts + [overall])
+
+def write_cache_meta(meta_path: str, meta: Dict) -> None:
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+def fetch_to_cache(urls, cache_subdir: str, session_limiter: Optional[TokenBucket] = None,
+                   rate_limit: float = 0.0, progress: Optional[ProgressModel] = None,
+                   health: Optional[MirrorHealth] = None,
+                   policy: Optional[RetryPolicy] = None, on_retry=None,
+                   telemetry: Optional[TelemetryLog] = None,
+                   durability: str = DURABILITY_NONE,
+                   cancel: Optional[CancelToken] = None, throttle: Optional[TokenBucket] = None,
+                   max_age: float = 0.0, buffer_size: int = MAX_CHUNK_SIZE,
+                   on_status=print) -> Tuple[str, bool, str]:
+    if isinstance(urls, str):
+        urls = [urls]
+    primary_url = urls[0]
+    filename = primary_url.split('/')[-1]
+    cache_dir = os.path.join(CACHE_DIR, cache_subdir)
+    os.makedirs(cache_dir, exist_ok=True)
+    file_path = os.path.join(cache_dir, filename)
+    meta_path = file_path + ".meta"
+    meta = read_json_file(meta_path) or {}
+    can_revalidate = os.path.exists(file_path) and meta.get("url") == primary_url
+    part_path = file_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    limiters = [session_limiter, TokenBucket(rate_limit) if rate_limit > 0 else None, throttle]
+    policy = policy or RetryPolicy(max_attempts=1)
+    candidates = health.rank(urls) if health else list(urls)
+    started_all = time.monotonic()
+    attempt = 0
+    transferred = [0]
+    def record(**fields):
+        if telemetry:
+            telemetry.emit("artifact", artifact=filename, url=primary_url, retries=attempt,
+                           bytes=transferred[0], elapsed=round(time.monotonic() - started_all, 4), **fields)
+    if (can_revalidate and max_age > 0 and time.time() - meta.get("checked", 0) < max_age
+            and os.path.getsize(file_path) == meta.get("size")):
+        record(mirror=mirror_of(meta.get("source") or primary_url), cache="hit", ok=True, fresh=True)
+        if progress:
+            progress.finish(filename, meta["size"])
+        return file_path, True, mirror_of(meta.get("source") or primary_url)
+    while True:
+        last_error = None
+        retryable = False
+        for url in candidates:
+            mirror = mirror_of(url)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            request = urllib.request.Request(url)
+            if offset:
+                request.add_header("Range", f"bytes={offset}-")
+            elif can_revalidate:
+                if meta.get("etag"):
+                    request.add_header("If-None-Match", meta["etag"])
+                if meta.get("last_modified"):
+                    request.add_header("If-Modified-Since", meta["last_modified"])
+            received = [0]
+            def count(n):
+                received[0] += n
+                transferred[0] += n
+                if progress:
+                    progress.advance(filename, n)
+            started = time.monotonic()
+            timings = {}
+            try:
+                resp, timings = open_timed(request, 30, cancel)
+                with resp:
+                    append = bool(offset) and resp.status == 206 and content_range_start(resp) == offset
+                    if offset and not append:
+                        on_status(f"{mirror} ignored range request, restarting {filename}")
+                    if progress:
+                        start = offset if append else 0
+                        progress.begin(filename, start, start + (resp.length or 0))
+                    transfer_started = time.perf_counter()
+                    try:
+                        stream_to_file(resp, part_path, limiters, count, append, cancel, buffer_size=buffer_size)
+                    finally:
+                        if cancel:
+                            cancel.unregister(resp)
+                    timings["transfer"] = time.perf_counter() - transfer_started
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+            except Exception as e:
+                if cancel and cancel.cancelled:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    record(mirror=mirror, cache="miss", ok=False, error="cancelled")
+                    raise InstallCancelled() from e
+                timings = getattr(request, "timings", None) or timings
+                if isinstance(e, urllib.error.HTTPError) and e.code == 304 and not offset:
+                    if health:
+                        health.record_success(mirror, 0, 0.0)
+                    write_cache_meta(meta_path, dict(meta, checked=time.time()))
+                    record(mirror=mirror, cache="hit", ok=True, **timings)
+                    if progress:
+                        progress.finish(filename, os.path.getsize(file_path))
+                    return file_path, True, mirror
+                if telemetry:
+                    telemetry.emit("attempt_failed", artifact=filename, mirror=mirror, offset=offset,
+                                   received=received[0], error=repr(e), retryable=is_retryable_error(e))
+                if is_disk_error(e):
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    record(mirror=mirror, cache="miss", ok=False, error=repr(e))
+                    raise
+                last_error = e
+                retryable = retryable or is_retryable_error(e)
+                if health:
+                    health.record_failure(mirror, e)
+                continue
+            elapsed = time.monotonic() - started
+            if health:
+                health.record_success(mirror, received[0], elapsed)
+            commit_started = time.perf_counter()
+            size = os.path.getsize(part_path)
+            commit_file(part_path, file_path, durability)
+            write_cache_meta(meta_path, {"url": primary_url, "source": url, "etag": etag,
+                                         "last_modified": last_modified, "size": size, "checked": time.time()})
+            timings["commit"] = time.perf_counter() - commit_started
+            if progress:
+                progress.finish(filename, size)
+            throughput = received[0] / timings["transfer"] if timings.get("transfer") else 0.0
+            record(mirror=mirror, cache="miss", ok=True, size=size, throughput=round(throughput, 1), **timings)
+            return file_path, False, mirror
+        attempt += 1
+        delay = policy.next_delay(attempt, started_all) if retryable else None
+        if delay is None:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            record(cache="miss", ok=False, error=repr(last_error))
+            raise last_error
+        on_status(f"Retrying {filename} in {delay:.1f}s (attempt {attempt + 1}/{policy.max_attempts}): {last_error}")
+        if on_retry:
+            on_retry(attempt, last_error, delay)
+        if cancel:
+            try:
+                cancel.sleep(delay)
+            except InstallCancelled:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+        else:
+            time.sleep(delay)
+
+class BundleError(Exception):
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+def read_tar_manifest(tar: tarfile.TarFile, kind: str) -> Dict:
+    member = tar.next()
+    if member is None or member.name != BUNDLE_MANIFEST:
+        raise VerificationError(f"{kind} does not start with {BUNDLE_MANIFEST}")
+    manifest = json.load(tar.extractfile(member))
+    if not isinstance(manifest, dict):
+        raise VerificationError(f"{kind} manifest is not a JSON object")
+    return manifest
+
+def extract_verified(tar: tarfile.TarFile, resolve, limiters: List[Optional[TokenBucket]], on_member=None,
+                     durability: str = DURABILITY_NONE, cancel: Optional[CancelToken] = None,
+                     buffer_size: int = MAX_CHUNK_SIZE, commit: bool = True) -> Dict[str, str]:
+    extracted = {}
+    try:
+        member = tar.next()
+        while member is not None:
+            target = resolve(member) if member.isfile() else None
+            if target is not None:
+                file_path, entry = target
+                name = os.path.basename(file_path)
+                part_path = file_path + ".part"
+                hasher = hashlib.sha256()
+                try:
+                    size = stream_to_file(tar.extractfile(member), part_path, limiters,
+                                          on_member(name, entry["size"]) if on_member else None, cancel=cancel,
+                                          hasher=hasher, buffer_size=buffer_size)
+                    if size != entry["size"] or hasher.hexdigest() != entry["sha256"]:
+                        raise VerificationError(f"{name} does not match its manifest entry")
+                except BaseException:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+                if commit:
+                    commit_file(part_path, file_path, durability)
+                extracted[member.name] = file_path
+            member = tar.next()
+    except BaseException:
+        if not commit:
+            discard_parts(extracted.values())
+        raise
+    return extracted
+
+def discard_parts(file_paths) -> None:
+    for file_path in file_paths:
+        if os.path.exists(file_path + ".part"):
+            os.remove(file_path + ".part")
+
+def extract_bundle(resp, cache_dir: str, limiters: List[Optional[TokenBucket]], on_member=None,
+                   durability: str = DURABILITY_NONE, cancel: Optional[CancelToken] = None,
+                   buffer_size: int = MAX_CHUNK_SIZE) -> Dict:
+    with tarfile.open(fileobj=resp, mode="r|") as tar:
+        manifest = read_tar_manifest(tar, "bundle")
+        files = manifest.get("files") or {}
+        def resolve(member: tarfile.TarInfo):
+            entry = files.get(member.name)
+            if entry is None or os.path.basename(member.name) != member.name:
+                raise BundleError(f"unexpected bundle member {member.name}")
+            return os.path.join(cache_dir, member.name), entry
+        extracted = extract_verified(tar, resolve, limiters, on_member, durability, cancel, buffer_size)
+    missing = set(files) - set(extracted)
+    if missing:
+        raise BundleError(f"bundle is missing {', '.join(sorted(missing))}")
+    return manifest
+
+def fetch_bundle(urls, cache_subdir: str, file_urls: List[str], session_limiter: Optional[TokenBucket] = None,
+                 rate_limit: float = 0.0, progress: Optional[ProgressModel] = None,
+                 health: Optional[MirrorHealth] = None, telemetry: Optional[TelemetryLog] = None,
+                 durability: str = DURABILITY_NONE, cancel: Optional[CancelToken] = None,
+                 throttle: Optional[TokenBucket] = None, max_age: float = 0.0,
+                 buffer_size: int = MAX_CHUNK_SIZE, policy: Optional[RetryPolicy] = None,
+                 on_retry=None, on_status=print) -> Dict[str, Tuple[str, bool, str]]:
+    if isinstance(urls, str):
+        urls = [urls]
+    primary_url = urls[0]
+    cache_dir = os.path.join(CACHE_DIR, cache_subdir)
+    os.makedirs(cache_dir, exist_ok=True)
+    bundle_meta_path = os.path.join(cache_dir, primary_url.split('/')[-1] + ".meta")
+    bundle_meta = read_json_file(bundle_meta_path) or {}
+    wanted = {url.split('/')[-1]: url for url in file_urls}
+    started = time.monotonic()
+
+    def is_cached(filename: str) -> bool:
+        entry = bundle_meta.get("files", {}).get(filename)
+        file_path = os.path.join(cache_dir, filename)
+        meta = read_json_file(file_path + ".meta") or {}
+        return (entry is not None and os.path.isfile(file_path) and meta.get("sha256") == entry["sha256"]
+                and os.path.getsize(file_path) == entry["size"])
+
+    def cached_results(mirror: str, **fields) -> Dict[str, Tuple[str, bool, str]]:
+        checked = time.time()
+        results = {}
+        for filename, url in wanted.items():
+            file_path = os.path.join(cache_dir, filename)
+            size = os.path.getsize(file_path)
+            if fields.get("revalidated"):
+                write_cache_meta(file_path + ".meta", dict(read_json_file(file_path + ".meta") or {}, checked=checked))
+            if progress:
+                progress.finish(filename, size)
+            if telemetry:
+                telemetry.emit("artifact", artifact=filename, url=url, retries=0, bytes=0, mirror=mirror,
+                               cache="hit", ok=True, bundle=True, elapsed=round(time.monotonic() - started, 4), **fields)
+            results[url] = (file_path, True, mirror)
+        if fields.get("revalidated"):
+            write_cache_meta(bundle_meta_path, dict(bundle_meta, checked=checked))
+        return results
+
+    all_cached = bundle_meta.get("url") == primary_url and all(is_cached(filename) for filename in wanted)
+    if all_cached and max_age > 0 and time.time() - bundle_meta.get("checked", 0) < max_age:
+        return cached_results(mirror_of(bundle_meta.get("source") or primary_url), fresh=True)
+
+    limiters = [session_limiter, TokenBucket(rate_limit) if rate_limit > 0 else None, throttle]
+    received = [0]
+    def on_member(name: str, size: int):
+        if name not in wanted:
+            return lambda n: received.__setitem__(0, received[0] + n)
+        if progress:
+            progress.begin(name, 0, size)
+        def count(n):
+            received[0] += n
+            if progress:
+                progress.advance(name, n)
+        return count
+
+    policy = policy or RetryPolicy(max_attempts=1)
+    candidates = health.rank(urls) if health else list(urls)
+    attempt = 0
+    manifest = None
+    while True:
+        last_error = None
+        retryable = False
+        for url in candidates:
+            mirror = mirror_of(url)
+            request = urllib.request.Request(url)
+            if all_cached:
+                if bundle_meta.get("etag"):
+                    request.add_header("If-None-Match", bundle_meta["etag"])
+                if bundle_meta.get("last_modified"):
+                    request.add_header("If-Modified-Since", bundle_meta["last_modified"])
+            try:
+                resp, timings = open_timed(request, 30, cancel)
+                with resp:
+                    transfer_started = time.perf_counter()
+                    try:
+                        manifest = extract_bundle(resp, cache_dir, limiters, on_member, durability, cancel, buffer_size)
+                    finally:
+                        if cancel:
+                            cancel.unregister(resp)
+                    timings["transfer"] = time.perf_counter() - transfer_started
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+                break
+            except InstallCancelled:
+                raise
+            except (VerificationError, BundleError) as e:
+                raise BundleError(f"bundle from {mirror} does not match its manifest: {e}", permanent=True) from e
+            except Exception as e:
+                if cancel and cancel.cancelled:
+                    raise InstallCancelled() from e
+                if isinstance(e, urllib.error.HTTPError):
+                    if e.code == 304 and all_cached:
+                        if health:
+                            health.record_success(mirror, 0, 0.0)
+                        return cached_results(mirror, revalidated=True, **(getattr(request, "timings", None) or {}))
+                    if e.code == 404:
+                        continue
+                last_error = e
+                retryable = retryable or is_retryable_error(e) or isinstance(e, tarfile.ReadError)
+                if health:
+                    health.record_failure(mirror, e)
+        if manifest is not None:
+            break
+        if last_error is None:
+            raise BundleError(f"no bundle published at {primary_url}", permanent=True)
+        attempt += 1
+        delay = policy.next_delay(attempt, started) if retryable else None
+        if delay is None:
+            raise BundleError(f"bundle could not be downloaded: {last_error}") from last_error
+        on_status(f"Retrying bundle in {delay:.1f}s (attempt {attempt + 1}/{policy.max_attempts}): {last_error}")
+        if on_retry:
+            on_retry(attempt, last_error, delay)
+        if cancel:
+            cancel.sleep(delay)
+        else:
+            time.sleep(delay)
+    missing = [filename for filename in wanted if filename not in manifest["files"]]
+    if missing:
+        raise BundleError(f"bundle does not contain {', '.join(missing)}", permanent=True)
+    if health:
+        health.record_success(mirror, received[0], time.monotonic() - started)
+    checked = time.time()
+    for filename, entry in manifest["files"].items():
+        file_url = wanted.get(filename) or primary_url.rsplit('/', 1)[0] + "/" + filename
+        write_cache_meta(os.path.join(cache_dir, filename + ".meta"),
+                         {"url": file_url, "source": url, "etag": None, "last_modified": None,
+                          "size": entry["size"], "sha256": entry["sha256"], "checked": checked})
+    write_cache_meta(bundle_meta_path, {"url": primary_url, "source": url, "etag": etag,
+                                        "last_modified": last_modified, "checked": checked,
+                                        "files": manifest["files"]})
+    if telemetry:
+        telemetry.emit("bundle", url=url, mirror=mirror, bytes=received[0], files=len(manifest["files"]),
+                       elapsed=round(time.monotonic() - started, 4), **timings)
+        for filename, file_url in wanted.items():
+            size = manifest["files"][filename]["size"]
+            telemetry.emit("artifact", artifact=filename, url=file_url, retries=attempt, bytes=size, mirror=mirror,
+                           cache="miss", ok=True, bundle=True, size=size,
+                           elapsed=round(time.monotonic() - started, 4))
+    return {file_url: (os.path.join(cache_dir, filename), False, mirror) for filename, file_url in wanted.items()}
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(MAX_CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def fetch_release_manifest(urls, cancel: Optional[CancelToken] = None) -> Optional[Dict]:
+    if isinstance(urls, str):
+        urls = [urls]
+    for url in urls:
+        request = urllib.request.Request(url, headers={"Range": f"bytes=0-{MANIFEST_PROBE_BYTES - 1}"})
+        try:
+            resp, _ = open_timed(request, PEER_TIMEOUT, cancel)
+            try:
+                with resp:
+                    head = resp.read(MANIFEST_PROBE_BYTES)
+            finally:
+                if cancel:
+                    cancel.unregister(resp)
+            with tarfile.open(fileobj=io.BytesIO(head), mode="r|") as tar:
+                member = tar.next()
+                if member is None or member.name != BUNDLE_MANIFEST:
+                    continue
+                manifest = json.load(tar.extractfile(member))
+        except InstallCancelled:
+            raise
+        except Exception as e:
+            if cancel and cancel.cancelled:
+                raise InstallCancelled() from e
+            continue
+        if isinstance(manifest.get("files"), dict):
+            return manifest
+    return None
+
+def fetch_verified(urls: List[str], cache_subdir: str, primary_url: str, expected: Dict,
+                   session_limiter: Optional[TokenBucket] = None, progress: Optional[ProgressModel] = None,
+                   telemetry: Optional[TelemetryLog] = None, durability: str = DURABILITY_NONE,
+                   cancel: Optional[CancelToken] = None, buffer_size: int = MAX_CHUNK_SIZE,
+                   on_status=print) -> Tuple[str, bool, str]:
+    filename = primary_url.split('/')[-1]
+    cache_dir = os.path.join(CACHE_DIR, cache_subdir)
+    os.makedirs(cache_dir, exist_ok=True)
+    file_path = os.path.join(cache_dir, filename)
+    meta_path = file_path + ".meta"
+    meta = read_json_file(meta_path) or {}
+    started = time.monotonic()
+    if os.path.isfile(file_path) and os.path.getsize(file_path) == expected["size"]:
+        if meta.get("sha256") is None:
+            meta["sha256"] = file_sha256(file_path)
+            write_cache_meta(meta_path, meta)
+        if meta["sha256"] == expected["sha256"]:
+            if progress:
+                progress.finish(filename, expected["size"])
+            if telemetry:
+                telemetry.emit("artifact", artifact=filename, url=primary_url, retries=0, bytes=0, cache="hit", ok=True,
+                               mirror=mirror_of(meta.get("source") or primary_url), elapsed=0.0, verified=True)
+            return file_path, True, mirror_of(meta.get("source") or primary_url)
+    part_path = file_path + ".part"
+    last_error = None
+    for url in urls:
+        mirror = mirror_of(url)
+        hasher = hashlib.sha256()
+        def count(n):
+            if progress:
+                progress.advance(filename, n)
+        try:
+            resp, timings = open_timed(urllib.request.Request(url), PEER_TIMEOUT, cancel)
+            with resp:
+                if progress:
+                    progress.begin(filename, 0, resp.length or expected["size"])
+                transfer_started = time.perf_counter()
+                try:
+                    size = stream_to_file(resp, part_path, [session_limiter], count, cancel=cancel, hasher=hasher,
+                                          buffer_size=buffer_size)
+                finally:
+                    if cancel:
+                        cancel.unregister(resp)
+                timings["transfer"] = time.perf_counter() - transfer_started
+            if size != expected["size"] or hasher.hexdigest() != expected["sha256"]:
+                raise VerificationError(f"{filename} from {mirror} does not match the release manifest")
+        except Exception as e:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            if isinstance(e, InstallCancelled) or (cancel and cancel.cancelled):
+                raise InstallCancelled() from e
+            on_status(f"Peer {mirror} could not provide {filename}: {e}")
+            last_error = e
+            continue
+        commit_file(part_path, file_path, durability)
+        write_cache_meta(meta_path, {"url": primary_url, "source": url, "etag": None, "last_modified": None,
+                                     "size": size, "sha256": expected["sha256"], "checked": time.time()})
+        if telemetry:
+            telemetry.emit("artifact", artifact=filename, url=primary_url, retries=0, bytes=size, cache="miss", ok=True,
+                           mirror=mirror, size=size, peer=True, elapsed=round(time.monotonic() - started, 4), **timings)
+        return file_path, False, mirror
+    raise last_error or InstallError(f"no peer has {filename}")
+
+class PeerCacheHandler(BaseHTTPRequestHandler):
+    cache_dir = CACHE_DIR
+    on_status = staticmethod(print)
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def cached_file(self) -> Optional[str]:
+        parts = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).strip("/").split("/")
+        if len(parts) != 2 or not parts[1].endswith(".jar"):
+            return None
+        if any(part in ("", ".", "..") or os.sep in part or (os.altsep and os.altsep in part) for part in parts):
+            return None
+        file_path = os.path.join(self.cache_dir, *parts)
+        meta = read_json_file(file_path + ".meta") or {}
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) != meta.get("size"):
+            return None
+        return file_path
+
+    def respond(self, head: bool) -> None:
+        file_path = self.cached_file()
+        if file_path is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        size = os.path.getsize(file_path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/java-archive")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        if head:
+            return
+        try:
+            with open(file_path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, MAX_CHUNK_SIZE)
+            self.on_status(f"Served {os.path.basename(file_path)} to {self.client_address[0]}")
+        except (BrokenPipeError, ConnectionResetError, socket.timeout):
+            self.close_connection = True
+
+class PeerCacheServer:
+    def __init__(self, cache_dir: str = CACHE_DIR, host: str = "0.0.0.0", port: int = PEER_PORT,
+                 discovery_port: Optional[int] = PEER_DISCOVERY_PORT, on_status=print):
+        handler = type("BoundPeerCacheHandler", (PeerCacheHandler,),
+                       {"cache_dir": cache_dir, "on_status": staticmethod(on_status)})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.peer_id = uuid.uuid4().hex[:12]
+        self.discovery = None
+        self.threads = []
+        self._stopping = threading.Event()
+        if discovery_port:
+            self.discovery = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.discovery.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.discovery.settimeout(0.5)
+            try:
+                self.discovery.bind(("", discovery_port))
+            except OSError as e:
+                on_status(f"Warning: peer discovery disabled, cannot listen on UDP {discovery_port}: {e}")
+                self.discovery.close()
+                self.discovery = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> "PeerCacheServer":
+        targets = [self.server.serve_forever] + ([self._answer_discovery] if self.discovery else [])
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self.threads:
+            thread.join()
+        if self.discovery:
+            self.discovery.close()
+
+    def _answer_discovery(self):
+        reply = json.dumps({"peer": self.peer_id, "port": self.port}).encode()
+        while not self._stopping.is_set():
+            try:
+                data, address = self.discovery.recvfrom(512)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if data == PEER_DISCOVERY_MAGIC:
+                try:
+                    self.discovery.sendto(reply, address)
+                except OSError:
+                    pass
+
+def discover_peers(timeout: float = PEER_DISCOVERY_TIMEOUT, port: int = PEER_DISCOVERY_PORT,
+                   exclude: Optional[str] = None) -> List[str]:
+    peers = {}
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        for address in ("<broadcast>", "127.0.0.1"):
+            try:
+                sock.sendto(PEER_DISCOVERY_MAGIC, (address, port))
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, (host, _) = sock.recvfrom(512)
+                reply = json.loads(data)
+            except socket.timeout:
+                break
+            except (OSError, ValueError):
+                continue
+            if not isinstance(reply, dict) or reply.get("peer") == exclude or reply.get("peer") in peers:
+                continue
+            peers[reply.get("peer")] = f"http://{host}:{reply.get('port')}"
+    return sorted(peers.values())
+
+class HashingReader:
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.hasher = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.hasher.update(data)
+        return data
+
+    def drain(self) -> str:
+        while self.read(MAX_CHUNK_SIZE):
+            pass
+        return self.hasher.hexdigest()
+
+def read_pack_manifest(pack_path: str) -> Dict:
+    with tarfile.open(pack_path, mode="r|") as tar:
+        manifest = read_tar_manifest(tar, "pack")
+    if not isinstance(manifest.get("versions"), dict):
+        raise VerificationError("pack manifest lists no versions")
+    return manifest
+
+def read_pack_digest(pack_path: str) -> Optional[str]:
+    try:
+        with open(pack_path + ".sha256", 'r', encoding='utf-8') as f:
+            return f.read().split()[0].lower()
+    except (OSError, IndexError):
+        return None
+
+def write_pack(pack_path: str, manifest: Dict, files: Dict[str, str], durability: str = DURABILITY_NONE) -> str:
+    part_path = pack_path + ".part"
+    body = json.dumps(manifest, indent=2).encode()
+    try:
+        with tarfile.open(part_path, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            info = tarfile.TarInfo(BUNDLE_MANIFEST)
+            info.size = len(body)
+            info.mtime = int(manifest.get("created", 0))
+            tar.addfile(info, io.BytesIO(body))
+            for arcname, file_path in files.items():
+                tar.add(file_path, arcname=arcname, recursive=False)
+        digest = file_sha256(part_path)
+        commit_file(part_path, pack_path, durability)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    with open(pack_path + ".sha256", 'w', encoding='utf-8') as f:
+        f.write(f"{digest}  {os.path.basename(pack_path)}\n")
+    return digest
+
+class InstallError(Exception):
+    pass
+
+class VerificationError(Exception):
+    pass
+
+@dataclass
+class Artifact:
+    url: str
+    filename: str
+    targets: List[str]
+
+@dataclass
+class FetchedArtifact:
+    path: str
+    from_cache: bool
+    mirror: str
+
+@dataclass
+class InstallPlan:
+    minecraft_version: str
+    urls: Dict[str, str]
+    targets: List[Dict[str, str]]
+    artifacts: List[Artifact] = field(default_factory=list)
+    existing: List[Tuple[str, Dict[str, str]]] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    removals: List[str] = field(default_factory=list)
+
+@dataclass
+class InstallOptions:
+    base_url: str = BASE_URL
+    mirrors: List[str] = field(default_factory=list)
+    extra_game_dirs: List[str] = field(default_factory=list)
+    limit_rate: float = 0.0
+    per_download_rate: float = 0.0
+    durability: str = DURABILITY_COMMIT
+    telemetry_file: Optional[str] = TELEMETRY_FILE
+    prefetch_rate: float = DEFAULT_PREFETCH_RATE
+    cache_max_age: float = 0.0
+    use_bundles: bool = True
+    peers: List[str] = field(default_factory=list)
+    discover_peers: bool = False
+    buffer_size: int = MAX_CHUNK_SIZE
+
+@dataclass
+class InstallResult:
+    plan: Optional[InstallPlan] = None
+    fetched: Dict[str, FetchedArtifact] = field(default_factory=dict)
+    errors: List[Tuple[str, Exception]] = field(default_factory=list)
+    installed: List[str] = field(default_factory=list)
+    cancelled: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.cancelled and self.plan is not None
+
+def read_saved_version(on_status=print) -> Tuple[str, str]:
+    try:
+        if os.path.exists(VERSION_FILE):
+            with open(VERSION_FILE, 'r') as f:
+                content = f.read().strip().split(',')
+                if len(content) >= 2:
+                    return content[0], content[1]
+                elif len(content) == 1:
+                    return content[0], ""
+    except Exception as e:
+        on_status(f"Error reading saved version: {e}")
+    return "0", ""
+
+def write_saved_version(glazed_version: str, minecraft_version: str = "", on_status=print) -> None:
+    try:
+        with open(VERSION_FILE, 'w') as f:
+            f.write(f"{glazed_version},{minecraft_version}")
+    except Exception as e:
+        on_status(f"Error saving version: {e}")
+
+def candidate_instances(minecraft_version: str, extra_dirs: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    instances = discover_minecraft_instances(extra_dirs)
+    candidates = [inst for inst in instances if inst["minecraft_version"] in (minecraft_version, "")]
+    if candidates:
+        return candidates
+    minecraft_dir = default_minecraft_dir()
+    if not minecraft_dir:
+        return []
+    return [make_instance("Minecraft", "Minecraft Launcher", minecraft_dir, minecraft_version)]
+
+def read_mod_metadata(path: str) -> Dict[str, Optional[str]]:
+    try:
+        with zipfile.ZipFile(path) as jar:
+            with jar.open("fabric.mod.json") as f:
+                data = json.loads(f.read().decode("utf-8", errors="replace"), strict=False)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        data = None
+    if not isinstance(data, dict):
+        return {"id": None, "version": None, "name": None}
+    version = data.get("version")
+    return {"id": data.get("id"), "version": None if version is None else str(version), "name": data.get("name")}
+
+class ModIndex:
+    def __init__(self, path: Optional[str] = MOD_INDEX_FILE, on_status=print):
+        self.path = path
+        self.on_status = on_status
+        self.records = (read_json_file(path) if path else None) or {}
+        self.folders = {}
+        self.watched = set()
+        self.dirty = set()
+        self.changed = False
+        self._lock = threading.Lock()
+
+    def watch(self, mods_path: str):
+        with self._lock:
+            self.watched.add(os.path.abspath(mods_path))
+
+    def mark_dirty(self, mods_path: str):
+        with self._lock:
+            self.dirty.add(os.path.abspath(mods_path))
+
+    def mods(self, mods_path: str) -> List[Dict]:
+        mods_path = os.path.abspath(mods_path)
+        with self._lock:
+            if mods_path not in self.folders or mods_path not in self.watched or mods_path in self.dirty:
+                self.dirty.discard(mods_path)
+                self.folders[mods_path] = self._scan(mods_path)
+            mods = list(self.folders[mods_path])
+        self._save()
+        return mods
+
+    def by_id(self, mods_path: str) -> Dict[str, List[Dict]]:
+        grouped = {}
+        for mod in self.mods(mods_path):
+            if mod["id"]:
+                grouped.setdefault(mod["id"], []).append(mod)
+        return grouped
+
+    def duplicates(self, mods_path: str) -> Dict[str, List[Dict]]:
+        return {mod_id: mods for mod_id, mods in self.by_id(mods_path).items() if len(mods) > 1}
+
+    def _scan(self, mods_path: str) -> List[Dict]:
+        mods = []
+        seen = set()
+        try:
+            entries = list(os.scandir(mods_path))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith(".jar"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            seen.add(entry.path)
+            record = self.records.get(entry.path)
+            if record is None or record["size"] != stat.st_size or record["mtime"] != stat.st_mtime_ns:
+                record = dict(read_mod_metadata(entry.path), file=entry.name, size=stat.st_size, mtime=stat.st_mtime_ns)
+                self.records[entry.path] = record
+                self.changed = True
+            mods.append(dict(record, path=entry.path))
+        for path in [path for path in self.records if os.path.dirname(path) == mods_path and path not in seen]:
+            del self.records[path]
+            self.changed = True
+        return sorted(mods, key=lambda mod: mod["file"])
+
+    def _save(self):
+        with self._lock:
+            if not self.path or not self.changed:
+                return
+            self.changed = False
+            records = dict(self.records)
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(records, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.on_status(f"Warning: could not save mod index: {e}")
+
+def describe_duplicates(index: ModIndex, target: Dict[str, str], removing=()) -> List[str]:
+    warnings = []
+    for mod_id, mods in sorted(index.duplicates(target["mods_path"]).items()):
+        mods = [mod for mod in mods if os.path.join(target["mods_path"], mod["file"]) not in removing]
+        if len(mods) > 1:
+            warnings.append(f"{target['name']}: {mod_id} is installed {len(mods)} times "
+                            f"({', '.join(mod['file'] for mod in mods)})")
+    return warnings
+
+def shipped_jar_digests() -> Set[Tuple[int, str]]:
+    digests = set()
+    try:
+        cache_dirs = [entry.path for entry in os.scandir(CACHE_DIR) if entry.is_dir()]
+    except OSError:
+        return digests
+    for cache_dir in cache_dirs:
+        for filename in LEGACY_MOD_FILES:
+            file_path = os.path.join(cache_dir, filename)
+            if not os.path.isfile(file_path):
+                continue
+            meta_path = file_path + ".meta"
+            meta = read_json_file(meta_path) or {}
+            try:
+                if meta.get("sha256") is None:
+                    meta["sha256"] = file_sha256(file_path)
+                    if os.path.exists(meta_path):
+                        write_cache_meta(meta_path, meta)
+                digests.add((os.path.getsize(file_path), meta["sha256"]))
+            except OSError:
+                continue
+    return digests
+
+def find_legacy_mods(mods_path: str, index: Optional[ModIndex] = None, on_status=print) -> List[str]:
+    removals = [os.path.join(mods_path, filename) for filename in LEGACY_MOD_FILES
+                if os.path.exists(os.path.join(mods_path, filename))]
+    if index is None:
+        return removals
+    managed = set(MANAGED_MOD_IDS.values())
+    renamed = [mod for mod in index.mods(mods_path) if mod["id"] in managed and mod["file"] not in LEGACY_MOD_FILES]
+    shipped = shipped_jar_digests() if renamed else set()
+    shipped_sizes = {size for size, _ in shipped}
+    for mod in renamed:
+        file_path = os.path.join(mods_path, mod["file"])
+        try:
+            matches = mod["size"] in shipped_sizes and (mod["size"], file_sha256(file_path)) in shipped
+        except OSError:
+            matches = False
+        if matches:
+            removals.append(file_path)
+        else:
+            on_status(f"Keeping {mod['file']}: it carries the {mod['id']} mod id but was not installed by Glazed")
+    return removals
+
+def remove_mods(file_paths: List[str], on_status=print, index: Optional[ModIndex] = None) -> None:
+    for file_path in file_paths:
+        filename = os.path.basename(file_path)
+        if os.path.exists(file_path):
+            try:
+                on_status(f"Removing old mod: {filename}")
+                os.remove(file_path)
+            except Exception as remove_error:
+                on_status(f"Warning: could not remove {filename}: {remove_error}")
+    if index is not None:
+        for mods_path in {os.path.dirname(file_path) for file_path in file_paths}:
+            index.mark_dirty(mods_path)
+
+def plan_downloads(urls: Dict[str, str], targets: List[Dict[str, str]], confirm_overwrite=None) -> List[Artifact]:
+    planned = []
+    for file_type in REQUIRED_FILES:
+        url = urls[file_type]
+        filename = url.split('/')[-1]
+        file_targets = []
+        for target in targets:
+            file_path = os.path.join(target["mods_path"], filename)
+            if os.path.exists(file_path) and confirm_overwrite and not confirm_overwrite(filename, target):
+                continue
+            file_targets.append(file_path)
+        if file_targets:
+            planned.append(Artifact(url, filename, file_targets))
+    return planned
+
+def existing_files(urls: Dict[str, str], targets: List[Dict[str, str]],
+                   removing=()) -> List[Tuple[str, Dict[str, str]]]:
+    existing = []
+    for file_type in REQUIRED_FILES:
+        filename = urls[file_type].split('/')[-1]
+        for target in targets:
+            file_path = os.path.join(target["mods_path"], filename)
+            if os.path.exists(file_path) and file_path not in removing:
+                existing.append((filename, target))
+    return existing
+
+def download_artifacts(urls: List[str], minecraft_version: str, mirrors: List[str],
+                       progress: Optional[ProgressModel] = None, cancel: Optional[CancelToken] = None,
+                       **fetch_options) -> Tuple[Dict[str, FetchedArtifact], List[Tuple[str, Exception]]]:
+    results = {}
+    errors = []
+    on_retry = progress.note_retry if progress else None
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as pool:
+        futures = {
+            url: pool.submit(fetch_to_cache, mirror_urls(url, mirrors), minecraft_version, progress=progress,
+                             on_retry=on_retry, cancel=cancel, **fetch_options)
+            for url in urls
+        }
+        for url, future in futures.items():
+            try:
+                results[url] = FetchedArtifact(*future.result())
+            except Exception as e:
+                errors.append((url.split('/')[-1], e))
+    if progress:
+        progress.flush()
+    return results, errors
+
+def verify_artifact(fetched: FetchedArtifact) -> None:
+    if not os.path.isfile(fetched.path):
+        raise VerificationError(f"{os.path.basename(fetched.path)} is missing from the cache")
+    size = os.path.getsize(fetched.path)
+    expected = (read_json_file(fetched.path + ".meta") or {}).get("size")
+    if size == 0 or (expected is not None and size != expected):
+        raise VerificationError(f"{os.path.basename(fetched.path)} is {size} bytes, expected {expected}")
+
+def commit_artifacts(artifacts: List[Artifact], fetched: Dict[str, FetchedArtifact],
+                     durability: str = DURABILITY_NONE, telemetry: Optional[TelemetryLog] = None,
+                     cancel: Optional[CancelToken] = None, on_status=print) -> List[str]:
+    installed = []
+    for i, artifact in enumerate(artifacts):
+        if cancel:
+            cancel.check()
+        result = fetched[artifact.url]
+        if result.from_cache:
+            on_status(f"Using cached {artifact.filename}")
+        else:
+            on_status(f"Downloaded {artifact.filename} from {urllib.parse.urlsplit(result.mirror).netloc}")
+        commit_started = time.perf_counter()
+        for file_path in artifact.targets:
+            link_or_copy(result.path, file_path, durability)
+            installed.append(file_path)
+        if telemetry:
+            telemetry.emit("install_commit", artifact=artifact.filename, targets=len(artifact.targets),
+                           commit=round(time.perf_counter() - commit_started, 6))
+        progress = (i + 1) / len(artifacts)
+        on_status(f"Progress: {progress * 100:.1f}%")
+    return installed
+
+class Prefetcher:
+    def __init__(self, installer: "Installer", rate: float = DEFAULT_PREFETCH_RATE):
+        self.installer = installer
+        self.rate = rate
+        self.limiter = TokenBucket(rate)
+        self.version = None
+        self.cancel_token = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    @property
+    def busy(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def prefetch(self, minecraft_version: str) -> bool:
+        if not self.enabled or minecraft_version not in self.installer.download_urls():
+            return False
+        with self.lock:
+            if self.version == minecraft_version and self.busy:
+                return False
+            if self.cancel_token is not None:
+                self.cancel_token.cancel()
+            self.version = minecraft_version
+            self.cancel_token = CancelToken()
+            self.thread = threading.Thread(target=self._run, args=(minecraft_version, self.cancel_token, self.thread),
+                                           daemon=True)
+            self.thread.start()
+        return True
+
+    def cancel(self):
+        with self.lock:
+            if self.cancel_token is not None:
+                self.cancel_token.cancel()
+            self.version = None
+
+    def settle(self, minecraft_version: str):
+        with self.lock:
+            thread = self.thread
+            if thread is None:
+                return
+            if self.version == minecraft_version:
+                self.limiter.set_rate(0)
+            elif self.cancel_token is not None:
+                self.cancel_token.cancel()
+        thread.join()
+        self.limiter.set_rate(self.rate)
+
+    def _run(self, minecraft_version: str, cancel: CancelToken, previous: Optional[threading.Thread]):
+        if previous is not None:
+            previous.join()
+        installer = self.installer
+        urls = installer.download_urls()[minecraft_version]
+        started = time.monotonic()
+        fetched = 0
+        try:
+            try:
+                bundled = installer.fetch_bundle(minecraft_version, [urls[file_type] for file_type in REQUIRED_FILES],
+                                                 cancel=cancel, throttle=self.limiter, max_age=PREFETCH_FRESHNESS)
+                fetched = sum(not result.from_cache for result in bundled.values())
+                installer.on_status(f"Prefetched Minecraft {minecraft_version} bundle ({fetched} downloaded)")
+                return
+            except BundleError:
+                pass
+            for file_type in REQUIRED_FILES:
+                cancel.check()
+                _, from_cache, _ = fetch_to_cache(
+                    mirror_urls(urls[file_type], installer.options.mirrors), minecraft_version,
+                    session_limiter=installer.session_limiter, throttle=self.limiter, health=installer.mirror_health,
+                    policy=installer.retry_policy, telemetry=installer.telemetry,
+                    durability=installer.options.durability, cancel=cancel, max_age=PREFETCH_FRESHNESS,
+                    buffer_size=installer.options.buffer_size, on_status=installer.on_status,
+                )
+                fetched += not from_cache
+            installer.on_status(f"Prefetched Minecraft {minecraft_version} artifacts ({fetched} downloaded)")
+        except InstallCancelled:
+            pass
+        except Exception as e:
+            installer.on_status(f"Prefetch for Minecraft {minecraft_version} stopped: {e}")
+        finally:
+            installer.telemetry.emit("prefetch", minecraft_version=minecraft_version, downloaded=fetched,
+                                     cancelled=cancel.cancelled, duration=round(time.monotonic() - started, 4))
+
+class Installer:
+    def __init__(self, options: Optional[InstallOptions] = None, on_status=print):
+        self.options = options or InstallOptions()
+        self.on_status = on_status
+        self.session_limiter = TokenBucket(self.options.limit_rate)
+        self.mirror_health = MirrorHealth(on_status=on_status)
+        self.retry_policy = RetryPolicy()
+        self.version_check_policy = RetryPolicy(max_attempts=3, budget=10.0)
+        self.telemetry = TelemetryLog(self.options.telemetry_file, on_status)
+        self.prefetcher = Prefetcher(self, self.options.prefetch_rate)
+        self.unbundled = set()
+        self.mod_index = ModIndex(on_status=on_status)
+        self.discovered_peers = None
+
+    def download_urls(self) -> Dict[str, Dict[str, str]]:
+        return download_urls_for(self.options.base_url)
+
+    def check_latest_version(self, on_status=None, cancel: Optional[CancelToken] = None) -> Tuple[bool, str]:
+        on_status = on_status or self.on_status
+        def fetch_latest():
+            if cancel:
+                cancel.check()
+            with urllib.request.urlopen(version_check_url(self.options.base_url), timeout=10) as resp:
+                if not cancel:
+                    return resp.read()
+                cancel.register(resp)
+                try:
+                    return resp.read()
+                finally:
+                    cancel.unregister(resp)
+        try:
+            content_bytes = self.version_check_policy.run(fetch_latest, label="version check", cancel=cancel,
+                                                          on_status=on_status)
+            latest_version = content_bytes.decode('utf-8', errors='ignore').strip()
+            saved_version, _ = read_saved_version(on_status)
+            on_status(f"Latest version: {latest_version}, Saved version: {saved_version}")
+            return latest_version != saved_version, latest_version
+        except InstallCancelled:
+            return False, "0"
+        except Exception as e:
+            on_status(f"Error checking Glazed version: {e}")
+            return False, "0"
+
+    def candidate_targets(self, minecraft_version: str) -> List[Dict[str, str]]:
+        missing = [game_dir for game_dir in custom_game_dirs(self.options.extra_game_dirs) if not os.path.isdir(game_dir)]
+        if missing:
+            raise InstallError(f"Game directory not found: {', '.join(missing)}")
+        return candidate_instances(minecraft_version, self.options.extra_game_dirs)
+
+    def resolve_plan(self, minecraft_version: str, targets: List[Dict[str, str]], overwrite: bool = True) -> InstallPlan:
+        urls = self.download_urls().get(minecraft_version)
+        if not urls:
+            raise InstallError(f"Unsupported Minecraft version: {minecraft_version}")
+        missing_files = [file for file in REQUIRED_FILES if file not in urls]
+        if missing_files:
+            if "glazed" in missing_files:
+                raise InstallError("Glazed Client not found. Please check if the latest release is available.")
+            raise InstallError(f"Missing required files: {', '.join(missing_files)}. Please try again later.")
+        if not targets:
+            raise InstallError("Cannot find Minecraft folder. Make sure the game is installed.")
+        removals = []
+        for target in targets:
+            try:
+                os.makedirs(target["mods_path"], exist_ok=True)
+            except OSError as e:
+                raise InstallError(f"Cannot create mods folder: {e}") from e
+            removals += find_legacy_mods(target["mods_path"], self.mod_index, self.on_status)
+        installing = {url.split('/')[-1] for url in urls.values()}
+        leaving = [file_path for file_path in removals if os.path.basename(file_path) not in installing]
+        warnings = [warning for target in targets for warning in describe_duplicates(self.mod_index, target, leaving)]
+        plan = InstallPlan(minecraft_version, urls, targets, existing=existing_files(urls, targets, removals),
+                           warnings=warnings, removals=removals)
+        return self.set_overwrite(plan, overwrite)
+
+    def set_overwrite(self, plan: InstallPlan, overwrite: bool) -> InstallPlan:
+        plan.artifacts = plan_downloads(
+            plan.urls, plan.targets,
+            lambda filename, target: overwrite or os.path.join(target["mods_path"], filename) in plan.removals,
+        )
+        return plan
+
+    def describe_source(self, plan: InstallPlan) -> str:
+        source = urllib.parse.urlsplit(plan.urls["glazed"]).netloc
+        if self.options.mirrors:
+            source += f" (+{len(self.options.mirrors)} mirror(s))"
+        return source
+
+    def fetch(self, plan: InstallPlan, progress: Optional[ProgressModel] = None,
+              cancel: Optional[CancelToken] = None) -> Tuple[Dict[str, FetchedArtifact], List[Tuple[str, Exception]]]:
+        self.prefetcher.settle(plan.minecraft_version)
+        urls = [artifact.url for artifact in plan.artifacts]
+        results = {}
+        peers = self.peer_urls() if urls else []
+        if peers:
+            results.update(self.fetch_from_peers(plan.minecraft_version, urls, peers, progress, cancel))
+            urls = [url for url in urls if url not in results]
+        if self.bundles_enabled(plan.minecraft_version) and urls:
+            try:
+                results.update(self.fetch_bundle(plan.minecraft_version, urls, progress, cancel,
+                                                 max_age=self.options.cache_max_age))
+                return results, []
+            except BundleError as e:
+                self.on_status(f"Downloading files separately: {e}")
+        if not urls:
+            return results, []
+        fetched, errors = download_artifacts(
+            urls, plan.minecraft_version, self.options.mirrors, progress, cancel,
+            session_limiter=self.session_limiter, rate_limit=self.options.per_download_rate,
+            health=self.mirror_health, policy=self.retry_policy, telemetry=self.telemetry,
+            durability=self.options.durability, max_age=self.options.cache_max_age,
+            buffer_size=self.options.buffer_size, on_status=self.on_status,
+        )
+        results.update(fetched)
+        return results, errors
+
+    def peer_urls(self) -> List[str]:
+        peers = list(self.options.peers)
+        if self.options.discover_peers:
+            if self.discovered_peers is None:
+                self.discovered_peers = discover_peers()
+                self.on_status(f"Discovered {len(self.discovered_peers)} peer(s) on the local network")
+            peers += [peer for peer in self.discovered_peers if peer not in peers]
+        return peers
+
+    def fetch_from_peers(self, minecraft_version: str, urls: List[str], peers: List[str],
+                         progress: Optional[ProgressModel] = None,
+                         cancel: Optional[CancelToken] = None) -> Dict[str, FetchedArtifact]:
+        bundle_urls = mirror_urls(bundle_url_for(self.options.base_url, minecraft_version), self.options.mirrors)
+        manifest = fetch_release_manifest(bundle_urls, cancel)
+        if manifest is None:
+            self.on_status(f"No release manifest for Minecraft {minecraft_version}, not using peers")
+            return {}
+        results = {}
+        for url in urls:
+            filename = url.split('/')[-1]
+            expected = manifest["files"].get(filename)
+            if not expected:
+                continue
+            peer_urls = [f"{peer.rstrip('/')}/{minecraft_version}/{filename}" for peer in peers]
+            try:
+                results[url] = FetchedArtifact(*fetch_verified(
+                    peer_urls, minecraft_version, url, expected, self.session_limiter, progress, self.telemetry,
+                    self.options.durability, cancel, self.options.buffer_size, self.on_status,
+                ))
+            except InstallCancelled:
+                raise
+            except Exception:
+                self.on_status(f"Falling back to the release server for {filename}")
+        return results
+
+    def bundles_enabled(self, minecraft_version: str) -> bool:
+        return self.options.use_bundles and minecraft_version not in self.unbundled
+
+    def fetch_bundle(self, minecraft_version: str, urls: List[str], progress: Optional[ProgressModel] = None,
+                     cancel: Optional[CancelToken] = None, throttle: Optional[TokenBucket] = None,
+                     max_age: float = 0.0) -> Dict[str, FetchedArtifact]:
+        if not self.bundles_enabled(minecraft_version):
+            raise BundleError(f"bundles are not used for Minecraft {minecraft_version}")
+        try:
+            results = fetch_bundle(
+                mirror_urls(bundle_url_for(self.options.base_url, minecraft_version), self.options.mirrors),
+                minecraft_version, urls, session_limiter=self.session_limiter,
+                rate_limit=self.options.per_download_rate, progress=progress, health=self.mirror_health,
+                telemetry=self.telemetry, durability=self.options.durability, cancel=cancel, throttle=throttle,
+                max_age=max_age, buffer_size=self.options.buffer_size, policy=self.retry_policy,
+                on_retry=progress.note_retry if progress else None, on_status=self.on_status,
+            )
+        except BundleError as e:
+            if e.permanent:
+                self.unbundled.add(minecraft_version)
+            raise
+        return {url: FetchedArtifact(*result) for url, result in results.items()}
+
+    def verify(self, plan: InstallPlan, fetched: Dict[str, FetchedArtifact]) -> List[Tuple[str, Exception]]:
+        errors = []
+        for artifact in plan.artifacts:
+            try:
+                verify_artifact(fetched[artifact.url])
+            except (KeyError, VerificationError) as e:
+                errors.append((artifact.filename, e))
+        return errors
+
+    def commit(self, plan: InstallPlan, fetched: Dict[str, FetchedArtifact],
+               cancel: Optional[CancelToken] = None) -> List[str]:
+        installed = commit_artifacts(plan.artifacts, fetched, self.options.durability, self.telemetry, cancel,
+                                     self.on_status)
+        remove_mods([file_path for file_path in plan.removals if file_path not in installed], self.on_status,
+                    self.mod_index)
+        saved_glazed, _ = read_saved_version(self.on_status)
+        write_saved_version(saved_glazed, plan.minecraft_version, self.on_status)
+        return installed
+
+    def export_pack(self, pack_path: str, minecraft_versions: List[str], progress: Optional[ProgressModel] = None,
+                    cancel: Optional[CancelToken] = None) -> Tuple[Dict, str]:
+        manifest = {"format": 1, "created": int(time.time()), "installer": CURRENT_VERSION, "versions": {}}
+        files = {}
+        for minecraft_version in minecraft_versions:
+            urls = self.download_urls().get(minecraft_version)
+            if not urls:
+                raise InstallError(f"Unsupported Minecraft version: {minecraft_version}")
+            artifacts = [Artifact(urls[file_type], urls[file_type].split('/')[-1], []) for file_type in REQUIRED_FILES]
+            plan = InstallPlan(minecraft_version, urls, [], artifacts)
+            if progress:
+                for artifact in artifacts:
+                    progress.add(artifact.filename)
+            fetched, errors = self.fetch(plan, progress, cancel)
+            errors = errors or self.verify(plan, fetched)
+            if errors:
+                filename, error = errors[0]
+                raise InstallError(f"Cannot export {filename}: {error}")
+            entries = {}
+            for artifact in artifacts:
+                path = fetched[artifact.url].path
+                meta = read_json_file(path + ".meta") or {}
+                size = os.path.getsize(path)
+                sha256 = meta.get("sha256") if meta.get("size") == size and meta.get("sha256") else file_sha256(path)
+                entries[artifact.filename] = {"url": artifact.url, "size": size, "sha256": sha256}
+                files[f"{minecraft_version}/{artifact.filename}"] = path
+            manifest["versions"][minecraft_version] = {"files": entries}
+        if cancel:
+            cancel.check()
+        return manifest, write_pack(pack_path, manifest, files, self.options.durability)
+
+    def fetch_pack(self, plan: InstallPlan, pack_path: str, progress: Optional[ProgressModel] = None,
+                   cancel: Optional[CancelToken] = None) -> Tuple[Dict[str, FetchedArtifact], List[Tuple[str, Exception]]]:
+        wanted = {artifact.filename: artifact.url for artifact in plan.artifacts}
+        cache_dir = os.path.join(CACHE_DIR, plan.minecraft_version)
+        os.makedirs(cache_dir, exist_ok=True)
+        source = f"pack://{os.path.basename(pack_path)}"
+        extracted = {}
+        with open(pack_path, 'rb') as raw:
+            reader = HashingReader(raw)
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                manifest = read_tar_manifest(tar, "pack")
+                entries = (manifest.get("versions") or {}).get(plan.minecraft_version, {}).get("files", {})
+                def resolve(member: tarfile.TarInfo):
+                    version, _, filename = member.name.partition("/")
+                    if version != plan.minecraft_version or filename not in wanted or filename not in entries:
+                        return None
+                    return os.path.join(cache_dir, filename), entries[filename]
+                def on_member(name: str, size: int):
+                    if progress:
+                        progress.begin(name, 0, size)
+                    return lambda n: progress.advance(name, n) if progress else None
+                extracted = extract_verified(tar, resolve, [], on_member, self.options.durability, cancel,
+                                             self.options.buffer_size, commit=False)
+            try:
+                digest = reader.drain()
+            except BaseException:
+                discard_parts(extracted.values())
+                raise
+        expected_digest = read_pack_digest(pack_path)
+        if expected_digest is None:
+            self.on_status(f"Warning: {os.path.basename(pack_path)} digest not verified (no .sha256 found)")
+        elif digest != expected_digest:
+            discard_parts(extracted.values())
+            raise VerificationError(f"{os.path.basename(pack_path)} does not match its .sha256 file")
+        for file_path in extracted.values():
+            commit_file(file_path + ".part", file_path, self.options.durability)
+        self.on_status(f"Pack {os.path.basename(pack_path)} sha256 {digest}")
+        results = {}
+        errors = []
+        checked = time.time()
+        for filename, url in wanted.items():
+            file_path = extracted.get(f"{plan.minecraft_version}/{filename}")
+            if file_path is None:
+                errors.append((filename, InstallError(f"{filename} is not in the pack")))
+                continue
+            entry = entries[filename]
+            write_cache_meta(file_path + ".meta", {"url": url, "source": source, "etag": None, "last_modified": None,
+                                                   "size": entry["size"], "sha256": entry["sha256"],
+                                                   "checked": checked})
+            results[url] = FetchedArtifact(file_path, False, source)
+        if progress:
+            progress.flush()
+        return results, errors
+
+    def install(self, minecraft_version: str, targets: List[Dict[str, str]], overwrite: bool = True,
+                progress: Optional[ProgressModel] = None, cancel: Optional[CancelToken] = None,
+                pack: Optional[str] = None, **telemetry_fields) -> InstallResult:
+        result = InstallResult()
+        started = time.monotonic()
+        self.telemetry.emit("install_start", minecraft_version=minecraft_version, **telemetry_fields)
+        try:
+            try:
+                result.plan = self.resolve_plan(minecraft_version, targets, overwrite)
+            except InstallError as e:
+                result.errors = [(minecraft_version, e)]
+                return result
+            if progress:
+                for artifact in result.plan.artifacts:
+                    progress.add(artifact.filename)
+            if pack:
+                try:
+                    result.fetched, result.errors = self.fetch_pack(result.plan, pack, progress, cancel)
+                except (InstallError, VerificationError, OSError, tarfile.TarError) as e:
+                    result.errors = [(os.path.basename(pack), e)]
+            else:
+                result.fetched, result.errors = self.fetch(result.plan, progress, cancel)
+            if cancel and cancel.cancelled:
+                raise InstallCancelled()
+            if not result.errors:
+                result.errors = self.verify(result.plan, result.fetched)
+            if not result.errors:
+                result.installed = self.commit(result.plan, result.fetched, cancel)
+        except InstallCancelled:
+            result.cancelled = True
+        finally:
+            self.telemetry.emit("install_end", minecraft_version=minecraft_version, ok=result.ok,
+                                duration=round(time.monotonic() - started, 4), **telemetry_fields)
+        return result
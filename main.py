@@ -1,27 +1,323 @@
 import sys
 import os
+import re
+import signal
+import tarfile
+import argparse
+import functools
 import threading
-from pathlib import Path
+import traceback
+from array import array
+from collections import deque
 from typing import Dict, List, Optional, Tuple
 from PyQt5 import QtWidgets, QtGui, QtCore
-from PyQt5.QtCore import QPropertyAnimation, QEasingCurve
-import urllib.request
-import urllib.error
+from PyQt5.QtCore import QEasingCurve
 import time
 import math
 import random
 
+from installer_core import (
+    BASE_URL, DEFAULT_BASE_URL, DEFAULT_PREFETCH_RATE, DURABILITY_COMMIT, DURABILITY_POLICIES, LIMIT_RATE_ENV,
+    LOW_FOOTPRINT_BUFFER_SIZE, MAX_CHUNK_SIZE, MIRRORS_ENV, PEER_PORT, PEERS_ENV, PREFETCH_FRESHNESS,
+    PREFETCH_RATE_ENV, TELEMETRY_FILE,
+    CancelToken, InstallCancelled, InstallError, InstallOptions, InstallPlan, Installer, MemoryProfiler, ModIndex,
+    PeerCacheServer, ProgressModel, VerificationError, read_pack_manifest,
+    describe_progress, discover_minecraft_instances, parse_rate, print_memory_report, print_telemetry_report,
+    read_saved_version, write_saved_version,
+)
+
 FONT_FAMILY = "Segoe UI"
+VISIBLE_VERSION_CARDS = 2
+VERSION_SEARCH_THRESHOLD = 4
+PREFETCH_SELECT_DELAY = 250
+PREFETCH_HOVER_DELAY = 800
+STALL_THRESHOLD = 50
+HEARTBEAT_INTERVAL = 20
+STALL_SUMMARY_TOP = 5
+
+def lerp(start, end, progress: float):
+    if isinstance(start, QtCore.QRect):
+        return QtCore.QRect(
+            round(start.x() + (end.x() - start.x()) * progress),
+            round(start.y() + (end.y() - start.y()) * progress),
+            round(start.width() + (end.width() - start.width()) * progress),
+            round(start.height() + (end.height() - start.height()) * progress),
+        )
+    if isinstance(start, QtCore.QPoint):
+        return QtCore.QPoint(round(start.x() + (end.x() - start.x()) * progress),
+                             round(start.y() + (end.y() - start.y()) * progress))
+    return start + (end - start) * progress
+
+class Tween:
+    def __init__(self, start, end, duration: int, on_value, easing=QEasingCurve.OutCubic, on_finished=None):
+        self.start = start
+        self.end = end
+        self.duration = duration / 1000.0
+        self.curve = QEasingCurve(easing)
+        self.on_value = on_value
+        self.on_finished = on_finished
+        self.started = time.monotonic()
+        self.value = start
+
+    def step(self, now: float) -> bool:
+        progress = 1.0 if self.duration <= 0 else min(1.0, (now - self.started) / self.duration)
+        self.value = lerp(self.start, self.end, self.curve.valueForProgress(progress))
+        self.on_value(self.value)
+        return progress < 1.0
+
+class AnimationClock(QtCore.QObject):
+    FRAME_INTERVAL = 16
+    MAX_STEP = 0.05
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.tweens = []
+        self.tickers = []
+        self.dirty = {}
+        self.last_tick = 0.0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self.tick)
+
+    def animate(self, start, end, duration: int, on_value, easing=QEasingCurve.OutCubic, on_finished=None) -> Tween:
+        tween = Tween(start, end, duration, on_value, easing, on_finished)
+        tween.step(tween.started)
+        self.tweens.append(tween)
+        self._wake()
+        return tween
+
+    def cancel(self, tween: Optional[Tween]) -> None:
+        if tween in self.tweens:
+            self.tweens.remove(tween)
+
+    def add_ticker(self, callback) -> None:
+        if callback not in self.tickers:
+            self.tickers.append(callback)
+            self._wake()
+
+    def remove_ticker(self, callback) -> None:
+        if callback in self.tickers:
+            self.tickers.remove(callback)
+
+    def request_update(self, widget: QtWidgets.QWidget, rect: Optional[QtCore.QRect] = None) -> None:
+        if rect is None or self.dirty.get(widget, rect) is None:
+            self.dirty[widget] = None
+        elif widget in self.dirty:
+            self.dirty[widget] = self.dirty[widget].united(rect)
+        else:
+            self.dirty[widget] = QtCore.QRect(rect)
+        self._wake()
+
+    def active(self) -> bool:
+        return bool(self.tweens or self.tickers or self.dirty)
+
+    def _wake(self):
+        if not self.timer.isActive():
+            self.last_tick = time.monotonic()
+            self.timer.start()
+
+    def tick(self):
+        now = time.monotonic()
+        dt = min(self.MAX_STEP, now - self.last_tick)
+        self.last_tick = now
+        for callback in list(self.tickers):
+            callback(dt)
+        for tween in list(self.tweens):
+            if tween in self.tweens and not tween.step(now):
+                self.tweens.remove(tween)
+                if tween.on_finished is not None:
+                    tween.on_finished()
+        self.flush()
+        if not self.active():
+            self.timer.stop()
+
+    def flush(self):
+        dirty, self.dirty = self.dirty, {}
+        for widget, rect in dirty.items():
+            try:
+                if rect is None:
+                    widget.update()
+                else:
+                    widget.update(rect)
+            except RuntimeError:
+                pass
 
-VERSION_CHECK_URL = "https://glazedclient.com/VERSION.txt"
-GLAZED_1_21_4_URL = "https://glazedclient.com/szpuszi/glazed-1.21.4.jar"
-GLAZED_1_21_5_URL = "https://glazedclient.com/szpuszi/glazed-1.21.5.jar"
-CURRENT_VERSION = "1.0.0"
+_animation_clock = None
 
-VERSION_FILE = os.path.join(os.path.expanduser("~"), ".glazed_version.txt")
+def animation_clock() -> AnimationClock:
+    global _animation_clock
+    if _animation_clock is None:
+        _animation_clock = AnimationClock(QtWidgets.QApplication.instance())
+    return _animation_clock
+
+class StallWatchdog(QtCore.QObject):
+    def __init__(self, threshold: int = STALL_THRESHOLD, telemetry=None, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.threshold = threshold / 1000.0
+        self.interval = HEARTBEAT_INTERVAL / 1000.0
+        self.telemetry = telemetry
+        self.main_thread = threading.get_ident()
+        self.project_dir = os.path.dirname(os.path.abspath(__file__))
+        self.lock = threading.Lock()
+        self.last_beat = time.monotonic()
+        self.sampled = None
+        self.stalls = []
+        self.stopping = threading.Event()
+        self.thread = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(HEARTBEAT_INTERVAL)
+        self.timer.timeout.connect(self.beat)
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.timer.start()
+        self.thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def beat(self):
+        now = time.monotonic()
+        with self.lock:
+            blocked = now - self.last_beat - self.interval
+            stack, self.sampled = self.sampled, None
+            self.last_beat = now
+        if blocked >= self.threshold:
+            self.record(blocked, stack)
+
+    def _watch(self):
+        while not self.stopping.wait(self.threshold / 2):
+            with self.lock:
+                if self.sampled is not None or time.monotonic() - self.last_beat - self.interval < self.threshold:
+                    continue
+                frame = sys._current_frames().get(self.main_thread)
+                self.sampled = traceback.extract_stack(frame) if frame is not None else []
+
+    def blame(self, stack) -> str:
+        if not stack:
+            return "unknown (stack not sampled)"
+        frame = next((f for f in reversed(stack) if f.filename.startswith(self.project_dir)), stack[-1])
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+
+    def record(self, blocked: float, stack) -> None:
+        where = self.blame(stack)
+        self.stalls.append((where, blocked))
+        lines = traceback.format_list(stack) if stack else []
+        print(f"Event loop stalled for {blocked * 1000:.0f} ms in {where}")
+        if lines:
+            print("".join(lines).rstrip())
+        if self.telemetry is not None:
+            self.telemetry.emit("stall", duration=round(blocked, 4), where=where, stack=lines)
+
+    def offenders(self) -> List[Tuple[str, int, float, float]]:
+        totals = {}
+        for where, blocked in self.stalls:
+            count, total, worst = totals.get(where, (0, 0.0, 0.0))
+            totals[where] = (count + 1, total + blocked, max(worst, blocked))
+        return sorted(((where,) + stats for where, stats in totals.items()), key=lambda row: row[2], reverse=True)
+
+    def print_summary(self, top: int = STALL_SUMMARY_TOP) -> None:
+        if not self.stalls:
+            print(f"No event loop stalls over {self.threshold * 1000:.0f} ms")
+            return
+        total = sum(blocked for _, blocked in self.stalls)
+        print(f"Event loop stalled {len(self.stalls)} time(s) for {total * 1000:.0f} ms in total. Worst offenders:")
+        for where, count, blocked, worst in self.offenders()[:top]:
+            print(f"  {blocked * 1000:>7.0f} ms  {count:>3}x  worst {worst * 1000:>5.0f} ms  {where}")
+
+THEME = {
+    "window": "#0f0f23",
+    "panel": "rgba(30, 31, 54, 0.5)",
+    "panel_dark": "rgba(15, 15, 35, 0.4)",
+    "title_bar": "rgba(15, 15, 35, 0.8)",
+    "button": "#2a2a3e",
+    "button_hover": "#3a3a4e",
+    "border": "#3a3a4e",
+    "accent": "#7c3aed",
+    "text": "#ffffff",
+    "muted": "#9ca3af",
+    "dim": "#6b7280",
+    "launch": "rgba(42, 45, 71, 0.6)",
+    "launch_hover": "rgba(124, 58, 237, 0.8)",
+    "launch_pressed": "rgba(30, 31, 54, 0.6)",
+    "error": "#ef4444",
+    "success": "#22c55e",
+    "online": "#10b981",
+}
+
+def compile_stylesheet(font_family: str, theme: Dict[str, str] = THEME) -> str:
+    t = theme
+    font = f"font-family: '{font_family}', Arial, sans-serif;"
+    return f"""
+    ModernGlazedInstaller, ModernGlazedInstaller QWidget {{ background-color: {t['window']}; border-radius: 20px; }}
+    QFrame#titleBar {{ background-color: {t['title_bar']}; border-radius: 20px 20px 0px 0px; }}
+    QPushButton#windowClose {{ color: {t['dim']}; background: transparent; border: none; font-size: 28px; {font} min-width: 44px; min-height: 44px; border-radius: 10px; }}
+    QPushButton#windowClose:hover {{ color: {t['text']}; }}
+    QFrame#constellation, QWidget#transparent {{ background-color: transparent; }}
+    QFrame#contentContainer {{ background-color: transparent; border-radius: 0px 0px 20px 20px; }}
+    QFrame#leftPanel, QWidget#versionList {{ background-color: {t['panel']}; border-radius: 12px; }}
+    QFrame#rightPanel, QWidget#centerBox {{ background-color: {t['panel_dark']}; border-radius: 12px; }}
+    QLabel#selectLabel {{ color: {t['text']}; font-size: 18px; font-weight: bold; {font} background: transparent; border: none; outline: none; }}
+    QLabel#tipLabel {{ color: {t['dim']}; font-size: 11px; {font} background: transparent; }}
+    QLabel#welcomeLabel {{ color: {t['accent']}; font-size: 28px; font-weight: bold; {font} background: transparent; }}
+    QLabel#statusLabel {{ color: {t['muted']}; font-size: 12px; {font} background: transparent; }}
+    QListView#versionView {{ background: transparent; border: none; outline: none; }}
+    QListView#versionView QScrollBar:vertical {{ background: transparent; width: 6px; margin: 0; }}
+    QListView#versionView QScrollBar::handle:vertical {{ background: {t['border']}; border-radius: 3px; min-height: 24px; }}
+    QListView#versionView QScrollBar::add-line:vertical, QListView#versionView QScrollBar::sub-line:vertical {{ height: 0; }}
+    QLineEdit#versionSearch {{ background-color: {t['button']}; color: {t['text']}; border: 1px solid {t['border']}; border-radius: 6px; padding: 6px 10px; font-size: 13px; {font} }}
+    QLineEdit#versionSearch:focus {{ border-color: {t['accent']}; }}
+    QPushButton#launchButton {{ color: white; font-size: 16px; font-weight: bold; {font} border: none; border-radius: 8px; background: {t['launch']}; }}
+    QPushButton#launchButton[state="hover"] {{ background: {t['launch_hover']}; }}
+    QPushButton#launchButton[state="pressed"] {{ background: {t['launch_pressed']}; }}
+    QProgressBar#progressBar {{ background: {t['launch']}; border: none; border-radius: 4px; }}
+    QProgressBar#progressBar::chunk {{ background: {t['accent']}; border-radius: 4px; }}
+    QPushButton#dialogButton {{ background-color: {t['button']}; color: white; border: 1px solid {t['border']}; border-radius: 6px; padding: 8px 16px; font-size: 13px; }}
+    QPushButton#dialogButton:hover {{ background-color: {t['button_hover']}; }}
+    QPushButton#dialogButton:disabled {{ color: {t['dim']}; }}
+    QPushButton#cancelButton {{ background-color: {t['button']}; color: white; border: 1px solid {t['border']}; border-radius: 6px; padding: 6px 16px; font-size: 13px; }}
+    QPushButton#cancelButton:hover {{ background-color: {t['button_hover']}; }}
+    QPushButton#cancelButton:disabled {{ color: {t['dim']}; }}
+
+    ModernGlazedInstaller QDialog {{ background: transparent; }}
+    QFrame#dialogWrapper {{ background-color: transparent; border-radius: 14px; }}
+    QFrame#dialogSurface {{ background-color: {t['window']}; border-radius: 14px; }}
+    QFrame#ynTitleBar {{ background-color: rgba(15,15,35,0.9); border-radius: 14px 14px 0 0; }}
+    QLabel#dialogTitle {{ color: white; font-weight: 600; font-size: 14px; background: transparent; }}
+    QPushButton#dialogClose {{ color: #9aa0aa; background: transparent; border: none; font-size: 22px; min-width: 32px; min-height: 32px; }}
+    QPushButton#dialogClose:hover {{ color: white; }}
+    QFrame#dialogContent {{ background: transparent; border-radius: 0 0 14px 14px; }}
+    QLabel#dialogMessage {{ color: white; font-size: 14px; background: transparent; }}
+    ModernGlazedInstaller QCheckBox {{ color: white; font-size: 13px; background: transparent; }}
+
+    QFrame#toast {{ background-color: rgba(26, 26, 46, 240); border: 1px solid {t['border']}; border-left: 4px solid {t['accent']}; border-radius: 8px; }}
+    QFrame#toast[kind="error"] {{ border-left-color: {t['error']}; }}
+    QFrame#toast[kind="success"] {{ border-left-color: {t['success']}; }}
+    QFrame#toast QLabel {{ color: white; font-size: 13px; background: transparent; border: none; }}
+"""
+
+def set_style_state(widget: QtWidgets.QWidget, name: str, value: str) -> None:
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
+@functools.lru_cache(maxsize=32)
+def rounded_mask(width: int, height: int, radius: int) -> QtGui.QRegion:
+    path = QtGui.QPainterPath()
+    path.addRoundedRect(QtCore.QRectF(0, 0, width, height), radius, radius)
+    return QtGui.QRegion(path.toFillPolygon().toPolygon())
 
 class YesNoDialog(QtWidgets.QDialog):
-    def __init__(self, parent: QtWidgets.QWidget, title: str, message: str):
+    def __init__(self, parent: QtWidgets.QWidget, title: str = "Question", message: str = ""):
         super().__init__(parent)
         self.choice_yes = False
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint | QtCore.Qt.Dialog)
@@ -29,52 +325,50 @@ class YesNoDialog(QtWidgets.QDialog):
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
         self._corner_radius = 14
 
-        self.setStyleSheet("QDialog { background: transparent; }")
-
         self.wrapper = QtWidgets.QFrame()
-        self.wrapper.setStyleSheet(f"background-color: transparent; border-radius: {self._corner_radius}px;")
+        self.wrapper.setObjectName("dialogWrapper")
         layout = QtWidgets.QVBoxLayout(self.wrapper)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
         self.surface = QtWidgets.QFrame()
-        self.surface.setStyleSheet(f"background-color: #0f0f23; border-radius: {self._corner_radius}px;")
+        self.surface.setObjectName("dialogSurface")
         surface_layout = QtWidgets.QVBoxLayout(self.surface)
         surface_layout.setContentsMargins(0, 0, 0, 0)
         surface_layout.setSpacing(0)
 
         title_bar = QtWidgets.QFrame()
         title_bar.setObjectName("ynTitleBar")
-        title_bar.setStyleSheet("background-color: rgba(15,15,35,0.9); border-radius: 14px 14px 0 0;")
         title_layout = QtWidgets.QHBoxLayout(title_bar)
         title_layout.setContentsMargins(14, 8, 14, 8)
         title_layout.setSpacing(8)
-        title_label = QtWidgets.QLabel(title)
-        title_label.setStyleSheet("color: white; font-weight: 600; font-size: 14px;")
-        title_layout.addWidget(title_label)
+        self.title_label = QtWidgets.QLabel()
+        self.title_label.setObjectName("dialogTitle")
+        title_layout.addWidget(self.title_label)
         title_layout.addStretch()
         close_btn = QtWidgets.QPushButton("×")
+        close_btn.setObjectName("dialogClose")
         close_btn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
-        close_btn.setStyleSheet("QPushButton { color: #9aa0aa; background: transparent; border: none; font-size: 22px; min-width: 32px; min-height: 32px; } QPushButton:hover { color: white; }")
         close_btn.clicked.connect(self.reject)
         title_layout.addWidget(close_btn)
 
         content = QtWidgets.QFrame()
-        content.setStyleSheet("background: transparent; border-radius: 0 0 14px 14px;")
+        content.setObjectName("dialogContent")
         content_layout = QtWidgets.QVBoxLayout(content)
         content_layout.setContentsMargins(18, 18, 18, 18)
         content_layout.setSpacing(14)
-        label = QtWidgets.QLabel(message)
-        label.setWordWrap(True)
-        label.setStyleSheet("color: white; font-size: 14px;")
-        content_layout.addWidget(label)
+        self.content_layout = content_layout
+        self.message_label = QtWidgets.QLabel()
+        self.message_label.setObjectName("dialogMessage")
+        self.message_label.setWordWrap(True)
+        content_layout.addWidget(self.message_label)
 
         btns = QtWidgets.QHBoxLayout()
         btns.addStretch()
         def make_btn(text: str):
             b = QtWidgets.QPushButton(text)
+            b.setObjectName("dialogButton")
             b.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
-            b.setStyleSheet("QPushButton { background-color: #2a2a3e; color: white; border: 1px solid #3a3a4e; border-radius: 6px; padding: 8px 16px; font-size: 13px; } QPushButton:hover { background-color: #3a3a4e; }")
             return b
         yes_btn = make_btn("Yes")
         no_btn = make_btn("No")
@@ -93,47 +387,47 @@ class YesNoDialog(QtWidgets.QDialog):
         root.setContentsMargins(0, 0, 0, 0)
         root.addWidget(self.wrapper)
 
-        shadow = QtWidgets.QGraphicsDropShadowEffect(self.surface)
-        shadow.setBlurRadius(18)
-        shadow.setColor(QtGui.QColor(0, 0, 0, 150))
-        shadow.setOffset(0, 6)
-        self.surface.setGraphicsEffect(shadow)
         self._opacity_effect = QtWidgets.QGraphicsOpacityEffect(self.surface)
         self._opacity_effect.setOpacity(1.0)
         self.surface.setGraphicsEffect(self._opacity_effect)
+        self._fade_tween = None
+        self._slide_tween = None
+
+        self.set_content(title, message)
 
+        title_bar.installEventFilter(self)
+        self._dragging = False
+        self._drag_offset = QtCore.QPoint()
+
+    def set_content(self, title: str, message: str):
+        self.choice_yes = False
+        self.title_label.setText(title)
+        self.message_label.setText(message)
         self.resize(460, 170)
+        self._center_on_parent()
+
+    def _center_on_parent(self):
+        parent = self.parentWidget()
         if parent is not None:
             center = parent.frameGeometry().center()
             g = self.frameGeometry()
             g.moveCenter(center)
             self.move(g.topLeft())
 
-        title_bar.installEventFilter(self)
-        self._dragging = False
-        self._drag_offset = QtCore.QPoint()
-
     def showEvent(self, event: QtGui.QShowEvent) -> None:
         super().showEvent(event)
         self._update_mask()
-        self._opacity_effect.setOpacity(0.0)
-        self._fade_anim = QtCore.QPropertyAnimation(self._opacity_effect, b"opacity")
-        self._fade_anim.setDuration(260)
-        self._fade_anim.setStartValue(0.0)
-        self._fade_anim.setEndValue(1.0)
-        self._fade_anim.setEasingCurve(QEasingCurve.OutCubic)
-
-        end_pos = self.surface.pos()
-        start_pos = QtCore.QPoint(end_pos.x(), end_pos.y() - 10)
-        self.surface.move(start_pos)
-        self._slide_anim = QtCore.QPropertyAnimation(self.surface, b"pos")
-        self._slide_anim.setDuration(280)
-        self._slide_anim.setStartValue(start_pos)
-        self._slide_anim.setEndValue(end_pos)
-        self._slide_anim.setEasingCurve(QEasingCurve.OutCubic)
-
-        self._fade_anim.start()
-        self._slide_anim.start()
+        clock = animation_clock()
+        clock.cancel(self._fade_tween)
+        clock.cancel(self._slide_tween)
+        self._fade_tween = clock.animate(0.0, 1.0, 260, self._opacity_effect.setOpacity)
+        self._slide_tween = clock.animate(QtCore.QPoint(0, -10), QtCore.QPoint(0, 0), 280, self.surface.move)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        clock = animation_clock()
+        clock.cancel(self._fade_tween)
+        clock.cancel(self._slide_tween)
+        super().hideEvent(event)
 
     def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
         super().resizeEvent(event)
@@ -142,11 +436,7 @@ class YesNoDialog(QtWidgets.QDialog):
     def _update_mask(self):
         if self.width() <= 0 or self.height() <= 0:
             return
-        path = QtGui.QPainterPath()
-        rect = QtCore.QRectF(self.rect())
-        path.addRoundedRect(rect, self._corner_radius, self._corner_radius)
-        region = QtGui.QRegion(path.toFillPolygon().toPolygon())
-        self.setMask(region)
+        self.setMask(rounded_mask(self.width(), self.height(), self._corner_radius))
 
     def _on_yes(self):
         self.choice_yes = True
@@ -166,6 +456,217 @@ class YesNoDialog(QtWidgets.QDialog):
                 return True
         return super().eventFilter(obj, event)
 
+class InstancePickerDialog(YesNoDialog):
+    def __init__(self, parent: QtWidgets.QWidget, message: str = "", instances: Optional[List[Dict[str, str]]] = None,
+                 preselected: Optional[List[int]] = None):
+        self.instances = []
+        self.checkboxes = []
+        super().__init__(parent, "Select Instances", message)
+        self.set_instances(message, instances or [], preselected or [])
+
+    def set_instances(self, message: str, instances: List[Dict[str, str]], preselected: List[int]):
+        self.set_content("Select Instances", message)
+        self.instances = instances
+        while len(self.checkboxes) < len(instances):
+            box = QtWidgets.QCheckBox()
+            self.content_layout.insertWidget(1 + len(self.checkboxes), box)
+            self.checkboxes.append(box)
+        for i, box in enumerate(self.checkboxes):
+            if i >= len(instances):
+                box.hide()
+                continue
+            instance = instances[i]
+            version = instance["minecraft_version"] or "unknown version"
+            box.setText(f"{instance['name']}  ({instance['launcher']}, {version})")
+            box.setToolTip(instance["game_dir"])
+            box.setChecked(i in preselected)
+            box.show()
+        self.resize(460, 170 + 28 * len(instances))
+        self._center_on_parent()
+
+    def selected_instances(self) -> List[Dict[str, str]]:
+        return [inst for inst, box in zip(self.instances, self.checkboxes) if box.isChecked()]
+
+class DialogPool:
+    def __init__(self, parent: QtWidgets.QWidget, keep: bool = True):
+        self.parent = parent
+        self.keep = keep
+        self.dialogs = {}
+
+    def get(self, dialog_type):
+        dlg = self.dialogs.get(dialog_type)
+        if dlg is None:
+            dlg = dialog_type(self.parent)
+            if self.keep:
+                self.dialogs[dialog_type] = dlg
+            else:
+                dlg.finished.connect(dlg.deleteLater)
+        return dlg
+
+    def prewarm(self, *dialog_types):
+        for dialog_type in dialog_types:
+            self.get(dialog_type).ensurePolished()
+
+class DecisionQueue(QtCore.QObject):
+    def __init__(self, parent: QtWidgets.QWidget):
+        super().__init__(parent)
+        self.pending = deque()
+        self.current = None
+        self.current_dialog = None
+        self.current_answer = None
+
+    def ask(self, make_dialog, on_answer, key: Optional[str] = None) -> bool:
+        if key is not None and (self.current == key or any(item[2] == key for item in self.pending)):
+            return False
+        self.pending.append((make_dialog, on_answer, key))
+        self._show_next()
+        return True
+
+    def busy(self) -> bool:
+        return self.current_dialog is not None or bool(self.pending)
+
+    def _show_next(self):
+        if self.current_dialog is not None or not self.pending:
+            return
+        make_dialog, on_answer, key = self.pending.popleft()
+        dlg = make_dialog()
+        self.current = key
+        self.current_dialog = dlg
+        self.current_answer = on_answer
+        dlg.finished.connect(self._on_finished)
+        dlg.open()
+
+    def _on_finished(self, _result: int):
+        dlg, on_answer = self.current_dialog, self.current_answer
+        dlg.finished.disconnect(self._on_finished)
+        self.current = self.current_dialog = self.current_answer = None
+        try:
+            on_answer(dlg)
+        finally:
+            QtCore.QTimer.singleShot(0, self._show_next)
+
+class Toast(QtWidgets.QFrame):
+    closed = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent: QtWidgets.QWidget):
+        super().__init__(parent)
+        self.setObjectName("toast")
+        self.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(14, 10, 14, 10)
+        self.label = QtWidgets.QLabel()
+        self.label.setWordWrap(True)
+        layout.addWidget(self.label)
+        self.setFixedWidth(340)
+        self.message = ""
+        self.dismissed = True
+        self._opacity_effect = QtWidgets.QGraphicsOpacityEffect(self)
+        self._opacity_effect.setOpacity(0.0)
+        self.setGraphicsEffect(self._opacity_effect)
+        self._fade_tween = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.dismiss)
+        self.hide()
+
+    def set_message(self, message: str, kind: str):
+        self.message = message
+        self.label.setText(message)
+        set_style_state(self, "kind", kind)
+        self.adjustSize()
+
+    def appear(self, duration: int):
+        self.dismissed = False
+        self.show()
+        self.raise_()
+        self._fade_to(1.0)
+        self._timer.start(duration)
+
+    def dismiss(self):
+        if self.dismissed:
+            return
+        self.dismissed = True
+        self._timer.stop()
+        self._fade_to(0.0)
+
+    def _fade_to(self, opacity: float):
+        clock = animation_clock()
+        clock.cancel(self._fade_tween)
+        self._fade_tween = clock.animate(self._opacity_effect.opacity(), opacity, 220, self._opacity_effect.setOpacity,
+                                         on_finished=self._on_faded)
+
+    def _on_faded(self):
+        if self.dismissed:
+            self.hide()
+            self.closed.emit(self)
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        self.dismiss()
+
+class NotificationQueue(QtCore.QObject):
+    MAX_VISIBLE = 3
+    MARGIN = 20
+    SPACING = 8
+
+    def __init__(self, host: QtWidgets.QWidget, keep: bool = True):
+        super().__init__(host)
+        self.host = host
+        self.keep = keep
+        self.toasts = []
+        self.spare = []
+
+    def prewarm(self):
+        while len(self.toasts) + len(self.spare) < self.MAX_VISIBLE + 1:
+            self.spare.append(self._make_toast())
+
+    def _make_toast(self) -> Toast:
+        toast = Toast(self.host)
+        toast.closed.connect(self._on_closed)
+        return toast
+
+    def notify(self, message: str, kind: str = "info", duration: int = 4000):
+        visible = [toast for toast in self.toasts if not toast.dismissed]
+        if visible and visible[-1].message == message:
+            return
+        for toast in visible[:max(0, len(visible) - self.MAX_VISIBLE + 1)]:
+            toast.dismiss()
+        toast = self.spare.pop() if self.spare else self._make_toast()
+        toast.set_message(message, kind)
+        self.toasts.append(toast)
+        self.reposition()
+        toast.appear(duration)
+
+    def _on_closed(self, toast: Toast):
+        if toast in self.toasts:
+            self.toasts.remove(toast)
+            if self.keep:
+                self.spare.append(toast)
+            else:
+                toast.deleteLater()
+        self.reposition()
+
+    def reposition(self):
+        y = self.host.height() - self.MARGIN
+        for toast in reversed(self.toasts):
+            y -= toast.height()
+            toast.move(self.host.width() - toast.width() - self.MARGIN, y)
+            y -= self.SPACING
+
+class ModsFolderWatcher(QtCore.QObject):
+    def __init__(self, index: ModIndex, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.index = index
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.index.mark_dirty)
+
+    def watch(self, mods_paths):
+        watched = set(self.watcher.directories())
+        for mods_path in mods_paths:
+            mods_path = os.path.abspath(mods_path)
+            if mods_path not in watched and os.path.isdir(mods_path) and self.watcher.addPath(mods_path):
+                self.index.watch(mods_path)
+                watched.add(mods_path)
+
 class AnimatedStar:
     def __init__(self, x, y, size, speed, opacity):
         self.x = x
@@ -195,7 +696,7 @@ class AnimatedStar:
         painter.drawPoint(int(self.x), int(self.y))
 
 class ConstellationBackground(QtWidgets.QFrame):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, incremental_rebuild: bool = True, **kwargs):
         super().__init__(*args, **kwargs)
         self.stars = []
         self.constellations = []
@@ -207,6 +708,9 @@ class ConstellationBackground(QtWidgets.QFrame):
         self.rebuild_interval_range = (2.5, 3.5)
         self.connection_rebuild_interval = random.uniform(*self.rebuild_interval_range)
         self.last_rebuild_time = -999.0
+        self.incremental_rebuild = incremental_rebuild
+        self.rebuild_budget = 0.002
+        self.pending_rebuild = None
         self.constellation_connections = []
         self.connection_params = {}
         self.connection_fade_times = {}
@@ -251,19 +755,29 @@ class ConstellationBackground(QtWidgets.QFrame):
 
         self.rebuild_connections()
 
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.animate)
-        self.timer.start(16)
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super().showEvent(event)
+        animation_clock().add_ticker(self.animate)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        super().hideEvent(event)
+        animation_clock().remove_ticker(self.animate)
 
-    def animate(self):
-        self.t += 0.016
+    def animate(self, dt: float = 0.016):
+        self.t += dt
         for star in self.stars:
-            star.update(0.016)
-        if (self.t - self.last_rebuild_time) >= self.connection_rebuild_interval:
-            self.rebuild_connections()
+            star.update(dt)
+        if self.pending_rebuild is not None:
+            self.continue_rebuild()
+        elif (self.t - self.last_rebuild_time) >= self.connection_rebuild_interval:
+            if self.incremental_rebuild:
+                self.pending_rebuild = self.rebuild_steps()
+                self.continue_rebuild()
+            else:
+                self.rebuild_connections()
             self.connection_rebuild_interval = random.uniform(*self.rebuild_interval_range)
         self.update_connection_fades()
-        self.update()
+        animation_clock().request_update(self)
 
     def paintEvent(self, event):
         super().paintEvent(event)
@@ -353,12 +867,13 @@ class ConstellationBackground(QtWidgets.QFrame):
     def update_connection_fades(self):
         current_time = self.t
         keys_to_remove = []
+        current_connections = set(self.constellation_connections)
 
         for key in self.connection_fade_times:
             fade_start = self.connection_fade_times[key]
             time_since_fade = current_time - fade_start
 
-            if key not in self.constellation_connections and time_since_fade > self.fade_duration:
+            if key not in current_connections and time_since_fade > self.fade_duration:
                 keys_to_remove.append(key)
 
         for key in keys_to_remove:
@@ -367,10 +882,18 @@ class ConstellationBackground(QtWidgets.QFrame):
                 del self.connection_params[key]
 
     def rebuild_connections(self):
-        for key in self.connection_params.keys():
-            if key not in self.connection_fade_times:
-                self.connection_fade_times[key] = self.t
+        self.pending_rebuild = None
+        for _ in self.rebuild_steps():
+            pass
+
+    def continue_rebuild(self):
+        deadline = time.perf_counter() + self.rebuild_budget
+        for _ in self.pending_rebuild:
+            if time.perf_counter() >= deadline:
+                return
+        self.pending_rebuild = None
 
+    def rebuild_steps(self):
         self.last_rebuild_time = self.t
         new_connections = []
         new_connection_params = {}
@@ -382,18 +905,6 @@ class ConstellationBackground(QtWidgets.QFrame):
         if random.random() < self.allow_third_length_prob:
             active_lengths.append(self.optional_third_length)
 
-        all_pairs = []
-        for i in range(num_points):
-            for j in range(i + 1, num_points):
-                dx = points[i][0] - points[j][0]
-                dy = points[i][1] - points[j][1]
-                dist = math.hypot(dx, dy)
-                all_pairs.append((dist, i, j))
-
-        random.shuffle(all_pairs)
-
-        degree = [0] * num_points
-
         def is_allowed_length(d: float) -> bool:
             for L in active_lengths:
                 tol = L * self.length_tolerance_ratio
@@ -401,23 +912,38 @@ class ConstellationBackground(QtWidgets.QFrame):
                     return True
             return False
 
-        for dist, i, j in all_pairs:
-            if degree[i] >= 1 or degree[j] >= 1:
-                continue
-            if is_allowed_length(dist):
-                new_connections.append((i, j))
-                new_connection_params[(i, j)] = {
-                    'phase': random.uniform(0.0, 2 * math.pi),
-                    'speed': random.uniform(1.0, 2.5),
-                }
-                degree[i] += 1
-                degree[j] += 1
+        all_pairs = array('L')
+        for i in range(num_points):
+            all_pairs.extend(range(i * num_points + i + 1, (i + 1) * num_points))
+            yield
 
+        degree = [0] * num_points
         max_connections = max(8, num_points // 3)
-        if len(new_connections) > max_connections:
-            new_connections = new_connections[:max_connections]
-            new_connection_params = {k: v for k, v in new_connection_params.items() 
-                                   if k in new_connections}
+
+        for k in range(len(all_pairs)):
+            r = random.randrange(k, len(all_pairs))
+            all_pairs[k], all_pairs[r] = all_pairs[r], all_pairs[k]
+            i, j = divmod(all_pairs[k], num_points)
+            if degree[i] < 1 and degree[j] < 1:
+                dist = math.hypot(points[i][0] - points[j][0], points[i][1] - points[j][1])
+                if is_allowed_length(dist):
+                    new_connections.append((i, j))
+                    new_connection_params[(i, j)] = {
+                        'phase': random.uniform(0.0, 2 * math.pi),
+                        'speed': random.uniform(1.0, 2.5),
+                    }
+                    degree[i] += 1
+                    degree[j] += 1
+                    if len(new_connections) >= max_connections:
+                        break
+            yield
+
+        self.swap_connections(new_connections, new_connection_params)
+
+    def swap_connections(self, new_connections: list, new_connection_params: dict):
+        for key in self.connection_params.keys():
+            if key not in self.connection_fade_times:
+                self.connection_fade_times[key] = self.t
 
         for key in new_connections:
             if key not in self.connection_fade_times:
@@ -426,71 +952,217 @@ class ConstellationBackground(QtWidgets.QFrame):
         self.constellation_connections = new_connections
         self.connection_params = new_connection_params
 
-class AnimatedCard(QtWidgets.QFrame):
-    def __init__(self, selected, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._hover_progress = 0.0
-        self.selected = selected
-        self.setMouseTracking(True)
-        self.setAttribute(QtCore.Qt.WA_Hover, True)
-        self.setStyleSheet("")
-        self.setCursor(QtCore.Qt.PointingHandCursor)
-    def get_hover_progress(self):
-        return self._hover_progress
-    def set_hover_progress(self, value):
-        self._hover_progress = value
-        self.update()
-    hover_progress = QtCore.pyqtProperty(float, get_hover_progress, set_hover_progress)
-    def paintEvent(self, event):
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-        base_bg = QtGui.QColor(42, 45, 71, int(0.68*255) if self.selected else int(0.6*255))
-        hover_bg = QtGui.QColor(52, 56, 89, int(0.75*255) if self.selected else int(0.7*255))
-        bg = QtGui.QColor(
-            int(base_bg.red() + (hover_bg.red() - base_bg.red()) * self._hover_progress),
-            int(base_bg.green() + (hover_bg.green() - base_bg.green()) * self._hover_progress),
-            int(base_bg.blue() + (hover_bg.blue() - base_bg.blue()) * self._hover_progress),
-            int(base_bg.alpha() + (hover_bg.alpha() - base_bg.alpha()) * self._hover_progress),
+class VersionListModel(QtCore.QAbstractListModel):
+    VersionRole = QtCore.Qt.UserRole + 1
+    DescriptionRole = QtCore.Qt.UserRole + 2
+    SearchRole = QtCore.Qt.UserRole + 3
+
+    def __init__(self, versions: List[Dict[str, str]], parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.versions = versions
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.versions)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.versions):
+            return None
+        version = self.versions[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return version["name"]
+        if role == self.VersionRole:
+            return version["version"]
+        if role == self.DescriptionRole:
+            return version["desc"]
+        if role == self.SearchRole:
+            return f"{version['name']} {version['version']} {version['desc']}"
+        return None
+
+class VersionCardDelegate(QtWidgets.QStyledItemDelegate):
+    CARD_HEIGHT = 144
+    CARD_SPACING = 16
+    HOVER_DURATION = 220
+
+    def __init__(self, view: QtWidgets.QListView, font_family: str):
+        super().__init__(view)
+        self.view = view
+        self.hover = {}
+        self.animations = {}
+        self.name_font = QtGui.QFont(font_family)
+        self.name_font.setPixelSize(18)
+        self.name_font.setBold(True)
+        self.version_font = QtGui.QFont(font_family)
+        self.version_font.setPixelSize(14)
+        self.desc_font = QtGui.QFont(font_family)
+        self.desc_font.setPixelSize(13)
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        if index.row() == index.model().rowCount() - 1:
+            return QtCore.QSize(option.rect.width(), self.CARD_HEIGHT)
+        return QtCore.QSize(option.rect.width(), self.CARD_HEIGHT + self.CARD_SPACING)
+
+    def set_hovered(self, index: QtCore.QPersistentModelIndex, hovered: bool):
+        clock = animation_clock()
+        clock.cancel(self.animations.get(index))
+        self.animations[index] = clock.animate(
+            float(self.hover.get(index, 0.0)), 1.0 if hovered else 0.0, self.HOVER_DURATION,
+            lambda value, key=index: self._on_hover_value(key, value),
+            on_finished=lambda key=index: self._on_hover_finished(key),
         )
-        painter.setBrush(bg)
+
+    def _on_hover_value(self, key: QtCore.QPersistentModelIndex, value: float):
+        self.hover[key] = value
+        if key.isValid():
+            animation_clock().request_update(self.view.viewport(), self.view.visualRect(QtCore.QModelIndex(key)))
+
+    def _on_hover_finished(self, key: QtCore.QPersistentModelIndex):
+        if self.hover.get(key, 0.0) <= 0.0 or not key.isValid():
+            self.hover.pop(key, None)
+            self.animations.pop(key, None)
+
+    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex):
+        selected = bool(option.state & QtWidgets.QStyle.State_Selected)
+        progress = self.hover.get(QtCore.QPersistentModelIndex(index), 0.0)
+        rect = QtCore.QRect(option.rect.topLeft(), QtCore.QSize(option.rect.width() - 1, self.CARD_HEIGHT))
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
         painter.setPen(QtCore.Qt.NoPen)
-        painter.drawRoundedRect(self.rect(), 12, 12)
-        base_border = QtGui.QColor(124, 58, 237, int(0.8*255) if self.selected else int(0.4*255))
-        hover_border = QtGui.QColor(124, 58, 237, int(0.9*255) if self.selected else int(0.6*255))
-        border_color = QtGui.QColor(
-            int(base_border.red() + (hover_border.red() - base_border.red()) * self._hover_progress),
-            int(base_border.green() + (hover_border.green() - base_border.green()) * self._hover_progress),
-            int(base_border.blue() + (hover_border.blue() - base_border.blue()) * self._hover_progress),
-            int(base_border.alpha() + (hover_border.alpha() - base_border.alpha()) * self._hover_progress),
-        )
-        border_width = int((3 if self.selected else 1) + (3 if self.selected else 2 - (3 if self.selected else 1)) * self._hover_progress)
-        pen = QtGui.QPen(border_color, border_width)
-        painter.setPen(pen)
+        painter.setBrush(QtGui.QColor(30, 31, 54, int(0.5 * 255)))
+        painter.drawRoundedRect(rect, 12, 12)
+
+        def mix(a: QtGui.QColor, b: QtGui.QColor) -> QtGui.QColor:
+            return QtGui.QColor(
+                int(a.red() + (b.red() - a.red()) * progress),
+                int(a.green() + (b.green() - a.green()) * progress),
+                int(a.blue() + (b.blue() - a.blue()) * progress),
+                int(a.alpha() + (b.alpha() - a.alpha()) * progress),
+            )
+        base_bg = QtGui.QColor(42, 45, 71, int(0.68*255) if selected else int(0.6*255))
+        hover_bg = QtGui.QColor(52, 56, 89, int(0.75*255) if selected else int(0.7*255))
+        painter.setBrush(mix(base_bg, hover_bg))
+        painter.drawRoundedRect(rect, 12, 12)
+        base_border = QtGui.QColor(124, 58, 237, int(0.8*255) if selected else int(0.4*255))
+        hover_border = QtGui.QColor(124, 58, 237, int(0.9*255) if selected else int(0.6*255))
+        border_width = int((3 if selected else 1) + (3 if selected else 2 - (3 if selected else 1)) * progress)
+        painter.setPen(QtGui.QPen(mix(base_border, hover_border), border_width))
         painter.setBrush(QtCore.Qt.NoBrush)
-        painter.drawRoundedRect(self.rect().adjusted(border_width//2, border_width//2, -border_width//2, -border_width//2), 12, 12)
-        super().paintEvent(event)
+        painter.drawRoundedRect(rect.adjusted(border_width//2, border_width//2, -border_width//2, -border_width//2), 12, 12)
+
+        content = rect.adjusted(30, 22, -30, -22)
+        text_rect = content.adjusted(0, 0, -(8 + 16), 0)
+        lines = [
+            (self.name_font, QtGui.QColor(THEME["text"]), index.data(QtCore.Qt.DisplayRole), 0),
+            (self.version_font, QtGui.QColor(THEME["muted"]), f"Game Version - {index.data(VersionListModel.VersionRole)}", 2),
+            (self.desc_font, QtGui.QColor("#a0a0a0"), index.data(VersionListModel.DescriptionRole), 6),
+        ]
+        total = sum(QtGui.QFontMetrics(font).height() + gap for font, _, _, gap in lines)
+        y = text_rect.top() + (text_rect.height() - total) // 2
+        for font, color, text, gap in lines:
+            metrics = QtGui.QFontMetrics(font)
+            y += gap
+            painter.setFont(font)
+            painter.setPen(color)
+            line_rect = QtCore.QRect(text_rect.left(), y, text_rect.width(), metrics.height())
+            painter.drawText(line_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+                             metrics.elidedText(text, QtCore.Qt.ElideRight, text_rect.width()))
+            y += metrics.height()
+
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor(THEME["online"]))
+        painter.drawEllipse(QtCore.QRect(content.right() - 8, content.center().y() - 3, 8, 8))
+        painter.restore()
+
+class VersionListView(QtWidgets.QListView):
+    hovered = QtCore.pyqtSignal(QtCore.QModelIndex)
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent)
+        self.hovered_index = QtCore.QPersistentModelIndex()
+        self.setMouseTracking(True)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.viewport().setCursor(QtCore.Qt.PointingHandCursor)
+
+    def set_hovered_index(self, index: QtCore.QModelIndex):
+        if QtCore.QModelIndex(self.hovered_index) == index:
+            return
+        delegate = self.itemDelegate()
+        if self.hovered_index.isValid():
+            delegate.set_hovered(self.hovered_index, False)
+        self.hovered_index = QtCore.QPersistentModelIndex(index)
+        if index.isValid():
+            delegate.set_hovered(self.hovered_index, True)
+        self.hovered.emit(index)
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
+        super().mouseMoveEvent(event)
+        self.set_hovered_index(self.indexAt(event.pos()))
+
+    def wheelEvent(self, event: QtGui.QWheelEvent) -> None:
+        super().wheelEvent(event)
+        self.set_hovered_index(self.indexAt(event.pos()))
+
+    def leaveEvent(self, event: QtCore.QEvent) -> None:
+        super().leaveEvent(event)
+        self.set_hovered_index(QtCore.QModelIndex())
 
 class ModernGlazedInstaller(QtWidgets.QWidget):
-    def __init__(self):
+    progress_changed = QtCore.pyqtSignal(dict)
+    install_finished = QtCore.pyqtSignal(dict)
+    update_checked = QtCore.pyqtSignal(bool, str, bool)
+    status_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, extra_game_dirs: Optional[List[str]] = None, limit_rate: float = 0.0,
+                 per_download_rate: float = 0.0, mirrors: Optional[List[str]] = None,
+                 telemetry_file: Optional[str] = TELEMETRY_FILE, durability: str = DURABILITY_COMMIT,
+                 base_url: str = BASE_URL, prefetch_rate: float = DEFAULT_PREFETCH_RATE, use_bundles: bool = True,
+                 peers: Optional[List[str]] = None, discover_peers: bool = False, low_footprint: bool = False,
+                 memory: Optional[MemoryProfiler] = None):
         super().__init__()
+        self.low_footprint = low_footprint
+        self.memory = memory
+        self.first_paint_seen = False
         self.selected_version = None
         self.download_urls = {}
         self.is_installing = False
+        options = InstallOptions(base_url, mirrors or [], extra_game_dirs or [], limit_rate, per_download_rate,
+                                 durability, telemetry_file, prefetch_rate, PREFETCH_FRESHNESS, use_bundles,
+                                 peers or [], discover_peers,
+                                 LOW_FOOTPRINT_BUFFER_SIZE if low_footprint else MAX_CHUNK_SIZE)
+        self.core = Installer(options, self.status_changed.emit)
+        self.mods_watcher = ModsFolderWatcher(self.core.mod_index, self)
+        self.pending_prefetch = None
+        self.prefetch_timer = QtCore.QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.start_prefetch)
+        self.install_started = 0.0
+        self.cancel_token = None
+        self.download_thread = None
+        self.dialog_pool = DialogPool(self, keep=not low_footprint)
+        self.decisions = DecisionQueue(self)
+        self.notifications = NotificationQueue(self, keep=not low_footprint)
+        self.progress_changed.connect(self.on_progress_changed)
+        self.install_finished.connect(self.on_install_finished)
+        self.update_checked.connect(self.on_update_checked)
+        self.status_changed.connect(self.update_status)
+        self.update_check_running = False
+        self.update_check_cancel = None
         self.setup_font()
         self.setWindowTitle("Glazed Client Installer")
         self.setFixedSize(900, 580)
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #0f0f23;
-                border-radius: 20px;
-            }
-        """)
+        QtWidgets.QApplication.instance().setStyleSheet(compile_stylesheet(self.font_family))
         self.setup_ui()
         self.center_window()
         
         self.load_download_urls()
         self.check_for_updates_on_startup()
+        if not low_footprint:
+            QtCore.QTimer.singleShot(0, self.prewarm_dialogs)
+        QtCore.QTimer.singleShot(0, self.watch_mods_folders)
         
         if self.versions:
             self.selected_version = self.versions[0]["version"]
@@ -520,15 +1192,26 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
     def setup_font(self):
         self.font_family = FONT_FAMILY
 
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self.first_paint_seen:
+            self.first_paint_seen = True
+            QtCore.QTimer.singleShot(0, functools.partial(self.mark_memory, "first paint"))
+
+    def mark_memory(self, label: str):
+        if self.memory is not None:
+            self.memory.mark(label)
+
     def setup_ui(self):
-        main_constellation = ConstellationBackground()
-        main_constellation.setStyleSheet("background-color: transparent; border-radius: 20px;")
-        main_constellation.setParent(self)
-        main_constellation.move(0, 0)
-        main_constellation.resize(self.width(), self.height())
+        if not self.low_footprint:
+            main_constellation = ConstellationBackground()
+            main_constellation.setObjectName("constellation")
+            main_constellation.setParent(self)
+            main_constellation.move(0, 0)
+            main_constellation.resize(self.width(), self.height())
         
         title_bar = QtWidgets.QFrame()
-        title_bar.setStyleSheet("background-color: rgba(15, 15, 35, 0.8); border-radius: 20px 20px 0px 0px;")
+        title_bar.setObjectName("titleBar")
         title_bar.setFixedHeight(40)
         title_bar_layout = QtWidgets.QHBoxLayout(title_bar)
         title_bar_layout.setContentsMargins(16, 8, 16, 8)
@@ -537,23 +1220,7 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         title_bar_layout.addStretch()
         
         close_btn = QtWidgets.QPushButton("×")
-        close_btn.setStyleSheet(f'''
-            QPushButton {{
-                color: #6b7280;
-                background: transparent;
-                border: none;
-                font-size: 28px;
-                font-family: '{self.font_family}', Arial, sans-serif;
-                min-width: 44px;
-                min-height: 44px;
-                border-radius: 10px;
-            }}
-            QPushButton:hover {{
-                color: #ffffff;
-                background: transparent;
-                border-radius: 10px;
-            }}
-        ''')
+        close_btn.setObjectName("windowClose")
         close_btn.clicked.connect(self.close)
         
         title_bar_layout.addWidget(close_btn)
@@ -565,17 +1232,17 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         main_vertical_layout.addWidget(title_bar)
         
         content_container = QtWidgets.QFrame()
-        content_container.setStyleSheet("background-color: transparent; border-radius: 0px 0px 20px 20px;")
+        content_container.setObjectName("contentContainer")
         content_layout = QtWidgets.QHBoxLayout(content_container)
         content_layout.setContentsMargins(32, 0, 32, 24)
         content_layout.setSpacing(32)
         
         left_container = QtWidgets.QFrame()
-        left_container.setStyleSheet("background-color: transparent;")
+        left_container.setObjectName("transparent")
         left_container.setFixedWidth(420)
         
         left_panel = QtWidgets.QFrame()
-        left_panel.setStyleSheet("background-color: rgba(30, 31, 54, 0.5); border-radius: 12px;")
+        left_panel.setObjectName("leftPanel")
         left_panel.setFixedWidth(380)
         left_panel.setParent(left_container)
         left_panel.move(0, 0)
@@ -585,19 +1252,45 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         left_layout.setSpacing(28)
         
         select_label = QtWidgets.QLabel("Select Version")
-        select_label.setStyleSheet(f"color: #ffffff; font-size: 18px; font-weight: bold; font-family: '{self.font_family}', Arial, sans-serif; background: transparent; border: none; outline: none;")
+        select_label.setObjectName("selectLabel")
         left_layout.addWidget(select_label)
         
-        self.version_cards = []
-        self.version_list = QtWidgets.QVBoxLayout()
-        self.version_list.setSpacing(16)
-        self.version_list.setContentsMargins(0, 0, 0, 0)
+        self.versions = [
+            {"name": "Minecraft 1.21.4", "version": "1.21.4", "desc": "Install Glazed Client for Minecraft 1.21.4", "icon": ""},
+            {"name": "Minecraft 1.21.5", "version": "1.21.5", "desc": "Install Glazed Client for Minecraft 1.21.5", "icon": ""},
+        ]
+        self.selected_card_index = 0
+        self.filtering_versions = False
+        self.version_model = VersionListModel(self.versions, self)
+        self.version_proxy = QtCore.QSortFilterProxyModel(self)
+        self.version_proxy.setSourceModel(self.version_model)
+        self.version_proxy.setFilterRole(VersionListModel.SearchRole)
+        self.version_proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
 
         list_container = QtWidgets.QWidget()
+        list_container.setObjectName("versionList")
         list_container_layout = QtWidgets.QVBoxLayout(list_container)
         list_container_layout.setContentsMargins(0, 0, 0, 0)
-        list_container_layout.setSpacing(0)
-        list_container_layout.addLayout(self.version_list)
+        list_container_layout.setSpacing(12)
+
+        self.version_search = QtWidgets.QLineEdit()
+        self.version_search.setObjectName("versionSearch")
+        self.version_search.setPlaceholderText("Search versions...")
+        self.version_search.setClearButtonEnabled(True)
+        self.version_search.textChanged.connect(self.filter_versions)
+        self.version_search.setVisible(len(self.versions) > VERSION_SEARCH_THRESHOLD)
+        list_container_layout.addWidget(self.version_search)
+
+        self.version_view = VersionListView()
+        self.version_view.setObjectName("versionView")
+        self.version_view.setItemDelegate(VersionCardDelegate(self.version_view, self.font_family))
+        self.version_view.setModel(self.version_proxy)
+        row_height = VersionCardDelegate.CARD_HEIGHT + VersionCardDelegate.CARD_SPACING
+        self.version_view.setFixedHeight(row_height * VISIBLE_VERSION_CARDS - VersionCardDelegate.CARD_SPACING)
+        self.version_view.selectionModel().currentRowChanged.connect(self.on_version_row_changed)
+        self.version_view.hovered.connect(self.on_version_hovered)
+        list_container_layout.addWidget(self.version_view)
+        self.select_card(self.selected_card_index)
 
         top_spacer = QtWidgets.QSpacerItem(0, 32, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
         left_layout.addItem(top_spacer)
@@ -606,31 +1299,25 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         left_layout.addItem(bottom_spacer)
         
         tip_label = QtWidgets.QLabel("Tip: Make sure Minecraft is closed during installation")
-        tip_label.setStyleSheet(f"color: #6b7280; font-size: 11px; font-family: '{self.font_family}', Arial, sans-serif; background: transparent;")
+        tip_label.setObjectName("tipLabel")
         left_layout.addWidget(tip_label, alignment=QtCore.Qt.AlignBottom)
         
-        self.versions = [
-            {"name": "Minecraft 1.21.4", "version": "1.21.4", "desc": "Install Glazed Client for Minecraft 1.21.4", "icon": ""},
-            {"name": "Minecraft 1.21.5", "version": "1.21.5", "desc": "Install Glazed Client for Minecraft 1.21.5", "icon": ""},
-        ]
-        self.selected_card_index = 0
-        for i, v in enumerate(self.versions):
-            self.add_version_card(v["name"], v["version"], v["desc"], i == self.selected_card_index, v["icon"], i)
         
         right_panel = QtWidgets.QFrame()
-        right_panel.setStyleSheet("background-color: rgba(15, 15, 35, 0.4); border-radius: 12px;")
+        right_panel.setObjectName("rightPanel")
         right_layout = QtWidgets.QVBoxLayout(right_panel)
         right_layout.setContentsMargins(0, 0, 0, 0)
         right_layout.setSpacing(0)
 
         center_box = QtWidgets.QWidget()
+        center_box.setObjectName("centerBox")
         center_layout = QtWidgets.QVBoxLayout(center_box)
         center_layout.setContentsMargins(0, 0, 0, 0)
         center_layout.setSpacing(20)
         center_layout.addSpacing(16)
 
         welcome_label = QtWidgets.QLabel("Welcome to Glazed Client")
-        welcome_label.setStyleSheet(f"color: #7c3aed; font-size: 28px; font-weight: bold; font-family: '{self.font_family}', Arial, sans-serif; background: transparent;")
+        welcome_label.setObjectName("welcomeLabel")
         welcome_label.setAlignment(QtCore.Qt.AlignCenter)
         center_layout.addWidget(welcome_label, alignment=QtCore.Qt.AlignHCenter)
 
@@ -638,18 +1325,7 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         self.launch_btn.setFixedHeight(50)
         self.launch_btn.setFixedWidth(200)
         self.create_button_hover_animation()
-        
-        self.launch_btn.setStyleSheet(f'''
-            QPushButton {{
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: '{self.font_family}', Arial, sans-serif;
-                border: none;
-                border-radius: 8px;
-                background: rgba(42, 45, 71, 0.6);
-            }}
-        ''')
+        self.launch_btn.setObjectName("launchButton")
         self.launch_btn.clicked.connect(self.launch_selected_version)
         
         self.launch_btn.enterEvent = lambda event: self.on_button_enter()
@@ -660,6 +1336,28 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         self.launch_btn.setContentsMargins(0, 0, 0, 0)
         center_layout.addWidget(self.launch_btn, alignment=QtCore.Qt.AlignHCenter)
         center_layout.addSpacing(18)
+
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedSize(320, 8)
+        self.progress_bar.setObjectName("progressBar")
+        self.progress_bar.hide()
+        center_layout.addWidget(self.progress_bar, alignment=QtCore.Qt.AlignHCenter)
+
+        self.status_label = QtWidgets.QLabel("")
+        self.status_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.status_label.setWordWrap(True)
+        self.status_label.setFixedWidth(360)
+        self.status_label.setObjectName("statusLabel")
+        center_layout.addWidget(self.status_label, alignment=QtCore.Qt.AlignHCenter)
+
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+        self.cancel_btn.setObjectName("cancelButton")
+        self.cancel_btn.clicked.connect(self.cancel_installation)
+        self.cancel_btn.hide()
+        center_layout.addWidget(self.cancel_btn, alignment=QtCore.Qt.AlignHCenter)
         
         QtCore.QTimer.singleShot(0, self.save_launch_btn_geometry)
 
@@ -671,111 +1369,59 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         
         main_vertical_layout.addWidget(content_container)
 
-    def add_version_card(self, name, version, desc, selected, icon_text, idx):
-        card = AnimatedCard(selected)
-        card.setFixedHeight(144)
-        card.anim = QPropertyAnimation(card, b"hover_progress")
-        card.anim.setDuration(220)
-        card.anim.setEasingCurve(QEasingCurve.OutCubic)
-        
-        layout = QtWidgets.QHBoxLayout(card)
-        layout.setContentsMargins(30, 22, 30, 22)
-        layout.setSpacing(16)
-        
-        text_container = QtWidgets.QWidget()
-        text_container.setMinimumWidth(0)
-        text_container.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
-        text_container.setStyleSheet("background: transparent;")
-        text_layout = QtWidgets.QVBoxLayout(text_container)
-        text_layout.setSpacing(0)
-        text_layout.setContentsMargins(0, 0, 0, 0)
-        
-        title_layout = QtWidgets.QHBoxLayout()
-        title_layout.setSpacing(8)
-        title_layout.setContentsMargins(0, 0, 0, 0)
-        
-        name_label = QtWidgets.QLabel(name)
-        name_label.setStyleSheet(f"color: #ffffff; font-size: 18px; font-weight: bold; font-family: '{self.font_family}', Arial, sans-serif; border: none; outline: none; background: transparent;")
-        title_layout.addWidget(name_label)
-        
-        title_layout.addStretch()
-        text_layout.addLayout(title_layout)
-
-        version_label = QtWidgets.QLabel(f"Game Version - {version}")
-        version_label.setStyleSheet(f"color: #9ca3af; font-size: 14px; font-family: '{self.font_family}', Arial, sans-serif; border: none; outline: none; background: transparent;")
-        version_label.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
-        text_layout.addSpacing(2)
-        text_layout.addWidget(version_label)
-
-        text_layout.addSpacing(6)
-
-        desc_label = QtWidgets.QLabel(desc)
-        desc_label.setStyleSheet(f"color: #a0a0a0; font-size: 13px; font-family: '{self.font_family}', Arial, sans-serif; border: none; outline: none; background: transparent;")
-        text_layout.addWidget(desc_label)
-        
-        layout.addWidget(text_container)
-        layout.setAlignment(text_container, QtCore.Qt.AlignVCenter)
-        layout.addStretch(1)
-        
-        dot = QtWidgets.QLabel()
-        dot.setFixedSize(8, 8)
-        dot.setStyleSheet("background-color: #10b981; border-radius: 4px; border: none; outline: none;")
-        dot.move(dot.x(), dot.y() + 1)
-        layout.addWidget(dot, alignment=QtCore.Qt.AlignVCenter)
-        layout.setAlignment(dot, QtCore.Qt.AlignVCenter)
-        
-        card.enterEvent = lambda event, c=card: self.on_card_enter(c)
-        card.leaveEvent = lambda event, c=card: self.on_card_leave(c)
-        card.mousePressEvent = lambda event, i=idx: self.select_card(i)
-        
-        self.version_list.addWidget(card)
-        self.version_cards.append(card)
-
     def select_card(self, idx):
-        for i, card in enumerate(self.version_cards):
-            if i == idx:
-                card.selected = True
-                card.update()
-            else:
-                card.selected = False
-                card.update()
         self.selected_card_index = idx
         self.selected_version = self.versions[idx]["version"]
-        self.update_card_styles()
-    
-    def on_card_enter(self, card):
-        if hasattr(card, 'anim'):
-            card.anim.stop()
-            card.anim.setStartValue(card.hover_progress)
-            card.anim.setEndValue(1.0)
-            card.anim.start()
-    
-    def on_card_leave(self, card):
-        if hasattr(card, 'anim'):
-            card.anim.stop()
-            card.anim.setStartValue(card.hover_progress)
-            card.anim.setEndValue(0.0)
-            card.anim.start()
+        proxy_index = self.version_proxy.mapFromSource(self.version_model.index(idx))
+        if not proxy_index.isValid():
+            self.version_view.selectionModel().clear()
+        elif self.version_view.currentIndex() != proxy_index:
+            self.version_view.setCurrentIndex(proxy_index)
+
+    def on_version_row_changed(self, current: QtCore.QModelIndex, previous: QtCore.QModelIndex):
+        source = self.version_proxy.mapToSource(current)
+        if not self.filtering_versions and source.isValid() and source.row() != self.selected_card_index:
+            self.select_card(source.row())
+            self.schedule_prefetch(self.selected_version, PREFETCH_SELECT_DELAY, replace=True)
+
+    def on_version_hovered(self, index: QtCore.QModelIndex):
+        source = self.version_proxy.mapToSource(index)
+        if source.isValid():
+            self.schedule_prefetch(self.versions[source.row()]["version"], PREFETCH_HOVER_DELAY, replace=False)
+        elif self.pending_prefetch and not self.pending_prefetch[1]:
+            self.prefetch_timer.stop()
+
+    def schedule_prefetch(self, version: str, delay: int, replace: bool):
+        if self.pending_prefetch and self.pending_prefetch[1] and self.prefetch_timer.isActive() and not replace:
+            return
+        self.pending_prefetch = (version, replace)
+        self.prefetch_timer.start(delay)
+
+    def start_prefetch(self):
+        version, replace = self.pending_prefetch
+        self.pending_prefetch = None
+        if self.is_installing or (not replace and self.core.prefetcher.busy):
+            return
+        self.core.prefetcher.prefetch(version)
+
+    def filter_versions(self, text: str):
+        self.filtering_versions = True
+        try:
+            self.version_proxy.setFilterFixedString(text.strip())
+        finally:
+            self.filtering_versions = False
+        self.select_card(self.selected_card_index)
+
     def create_button_hover_animation(self):
-        self.button_hover_animation = QPropertyAnimation(self.launch_btn, b"geometry")
-        self.button_hover_animation.setDuration(200)
-        self.button_hover_animation.setEasingCurve(QEasingCurve.OutCubic)
+        self.button_hover_tween = None
+
+    def animate_launch_button(self, target_geometry: QtCore.QRect):
+        clock = animation_clock()
+        clock.cancel(self.button_hover_tween)
+        self.button_hover_tween = clock.animate(self.launch_btn.geometry(), target_geometry, 200, self.launch_btn.setGeometry)
         
     def on_button_enter(self):
-        if hasattr(self, 'button_hover_animation'):
-            self.button_hover_animation.stop()
-        
-        self.launch_btn.setStyleSheet(f'''
-            QPushButton {{
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: '{self.font_family}', Arial, sans-serif;
-                border: none;
-                border-radius: 8px;
-                background: rgba(124, 58, 237, 0.8);
-            }}
-        ''')
+        set_style_state(self.launch_btn, "state", "hover")
         
         current_geometry = self.launch_btn.geometry()
         new_height = int(current_geometry.height() * 1.05)
@@ -783,46 +1429,14 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         new_y = current_geometry.y() - (height_increase // 2) - 4
         target_geometry = QtCore.QRect(current_geometry.x(), new_y, current_geometry.width(), new_height)
         
-        self.button_hover_animation.setStartValue(current_geometry)
-        self.button_hover_animation.setEndValue(target_geometry)
-        self.button_hover_animation.start()
+        self.animate_launch_button(target_geometry)
     
     def on_button_leave(self):
-        if hasattr(self, 'button_hover_animation'):
-            self.button_hover_animation.stop()
-        
-        self.launch_btn.setStyleSheet(f'''
-            QPushButton {{
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: '{self.font_family}', Arial, sans-serif;
-                border: none;
-                border-radius: 8px;
-                background: rgba(42, 45, 71, 0.6);
-            }}
-        ''')
-        
-        current_geometry = self.launch_btn.geometry()
-        self.button_hover_animation.setStartValue(current_geometry)
-        self.button_hover_animation.setEndValue(self.original_button_geometry)
-        self.button_hover_animation.start()
+        set_style_state(self.launch_btn, "state", "normal")
+        self.animate_launch_button(self.original_button_geometry)
     
     def on_button_press(self, event):
-        if hasattr(self, 'button_hover_animation'):
-            self.button_hover_animation.stop()
-        
-        self.launch_btn.setStyleSheet(f'''
-            QPushButton {{
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: '{self.font_family}', Arial, sans-serif;
-                border: none;
-                border-radius: 8px;
-                background: rgba(30, 31, 54, 0.6);
-            }}
-        ''')
+        set_style_state(self.launch_btn, "state", "pressed")
         
         current_geometry = self.launch_btn.geometry()
         center = current_geometry.center()
@@ -832,9 +1446,7 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         new_y = center.y() - new_height // 2 + 1
         target_geometry = QtCore.QRect(new_x, new_y, new_width, new_height)
         
-        self.button_hover_animation.setStartValue(current_geometry)
-        self.button_hover_animation.setEndValue(target_geometry)
-        self.button_hover_animation.start()
+        self.animate_launch_button(target_geometry)
         
         self.launch_btn.clicked.emit()
     
@@ -849,9 +1461,8 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
             self.show_error("Please select a version first!")
             return
         selected_info = self.versions[self.selected_card_index]
-        reply = self.show_question(f"Launch {selected_info['name']} (Minecraft {selected_info['version']})?")
-        if reply:
-            self.start_installation()
+        self.ask_question(f"Launch {selected_info['name']} (Minecraft {selected_info['version']})?",
+                          lambda yes: yes and self.start_installation(), key="launch")
 
     def animate_startup(self):
         self.attributes('-alpha', 0.0)
@@ -864,38 +1475,13 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         threading.Thread(target=fade_in, daemon=True).start()
 
     def get_saved_version(self) -> Tuple[str, str]:
-        try:
-            if os.path.exists(VERSION_FILE):
-                with open(VERSION_FILE, 'r') as f:
-                    content = f.read().strip().split(',')
-                    if len(content) >= 2:
-                        return content[0], content[1]
-                    elif len(content) == 1:
-                        return content[0], ""
-        except Exception as e:
-            print(f"Error reading saved version: {e}")
-        return "0", ""
+        return read_saved_version()
     
     def save_version(self, glazed_version: str, minecraft_version: str = ""):
-        try:
-            with open(VERSION_FILE, 'w') as f:
-                f.write(f"{glazed_version},{minecraft_version}")
-        except Exception as e:
-            print(f"Error saving version: {e}")
+        write_saved_version(glazed_version, minecraft_version)
     
-    def check_glazed_version(self) -> Tuple[bool, str]:
-        try:
-            with urllib.request.urlopen(VERSION_CHECK_URL, timeout=10) as resp:
-                content_bytes = resp.read()
-                latest_version = content_bytes.decode('utf-8', errors='ignore').strip()
-            saved_version, saved_minecraft = self.get_saved_version()
-            print(f"Latest version: {latest_version}, Saved version: {saved_version}")
-            if latest_version != saved_version:
-                return True, latest_version
-            return False, latest_version
-        except Exception as e:
-            print(f"Error checking Glazed version: {e}")
-            return False, "0"
+    def check_glazed_version(self, cancel: Optional[CancelToken] = None) -> Tuple[bool, str]:
+        return self.core.check_latest_version(on_status=print, cancel=cancel)
     
     def center_window(self):
         screen = QtWidgets.QApplication.desktop().screenGeometry()
@@ -905,185 +1491,95 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         self.move(x, y)
     
     def load_download_urls(self):
-        self.download_urls = {
-            "1.21.4": {
-                "meteor-client": "https://glazedclient.com/1.21.4/meteor-client-1.21.4-42.jar",
-                "baritone": "https://glazedclient.com/1.21.4/baritone-meteor-1.21.4.jar",
-                "glazed": GLAZED_1_21_4_URL
-            },
-            "1.21.5": {
-                "meteor-client": "https://glazedclient.com/1.21.5/meteor-client-1.21.5-54.jar",
-                "baritone": "https://glazedclient.com/1.21.5/baritone-meteor-1.21.5.jar",
-                "glazed": GLAZED_1_21_5_URL
-            }
-        }
+        self.download_urls = self.core.download_urls()
         print(f"Loaded download URLs: {self.download_urls}")
     
     def check_for_updates_on_startup(self):
-        def check_in_background():
-            has_update, version = self.check_glazed_version()
-            if has_update:
-                QtCore.QTimer.singleShot(0, lambda: self.show_glazed_update_dialog(version))
-        QtCore.QTimer.singleShot(1000, check_in_background)
+        QtCore.QTimer.singleShot(1000, lambda: self.start_update_check(False))
     
     def check_for_updates_manual(self):
+        self.start_update_check(True)
+
+    def start_update_check(self, manual: bool):
+        if self.update_check_running:
+            return
+        self.update_check_running = True
+        self.update_check_cancel = CancelToken()
+        cancel = self.update_check_cancel
         def check_in_background():
-            has_update, version = self.check_glazed_version()
-            if has_update:
-                QtCore.QTimer.singleShot(0, lambda: self.show_glazed_update_dialog(version))
-            else:
-                QtCore.QTimer.singleShot(0, lambda: self.show_success("You have the latest version!"))
-        QtCore.QTimer.singleShot(0, check_in_background)
+            has_update, version = self.check_glazed_version(cancel)
+            if not cancel.cancelled:
+                self.update_checked.emit(has_update, version, manual)
+        threading.Thread(target=check_in_background, daemon=True).start()
+
+    def on_update_checked(self, has_update: bool, version: str, manual: bool):
+        self.update_check_running = False
+        if has_update:
+            self.show_glazed_update_dialog(version)
+        elif manual:
+            self.show_success("You have the latest version!")
     
     def show_glazed_update_dialog(self, version: str):
         saved_version, saved_minecraft = self.get_saved_version()
-        if self.show_question(f"New Glazed Client version {version} is available!\n\nCurrent version: {saved_version}\nNew version: {version}\n\nWould you like to download the new version?"):
-            self.save_version(version, saved_minecraft)
-            if saved_minecraft:
-                self.show_success(f"Installing for Minecraft {saved_minecraft}...")
-                self.selected_version = saved_minecraft
-                self.start_installation()
-            else:
-                self.show_success(f"Version {version} has been saved. Please select a Minecraft version and install.")
-    
-    def get_minecraft_mods_path(self) -> Optional[str]:
-        appdata = os.getenv('APPDATA')
-        if not appdata:
-            return None
-        minecraft_path = os.path.join(appdata, '.minecraft')
-        mods_path = os.path.join(minecraft_path, 'mods')
-        return mods_path
-    
-    def create_mods_directory(self, mods_path: str) -> bool:
-        try:
-            os.makedirs(mods_path, exist_ok=True)
-            return True
-        except Exception as e:
-            self.show_error(f"Cannot create mods folder: {str(e)}")
-            return False
-
-    def remove_old_mods(self, mods_path: str) -> None:
-        legacy_files = [
-            "baritone-meteor-1.21.4.jar",
-            "glazed-1.21.4.jar",
-            "meteor-client-1.21.4-42.jar",
-            "baritone-meteor-1.21.5.jar",
-            "glazed-1.21.5.jar",
-            "meteor-client-1.21.5-54.jar",
-        ]
-        for filename in legacy_files:
-            file_path = os.path.join(mods_path, filename)
-            if os.path.exists(file_path):
-                try:
-                    self.update_status(f"Removing old mod: {filename}")
-                    os.remove(file_path)
-                except Exception as remove_error:
-                    print(f"Warning: could not remove {filename}: {remove_error}")
+        self.ask_question(f"New Glazed Client version {version} is available!\n\nCurrent version: {saved_version}\nNew version: {version}\n\nWould you like to download the new version?",
+                          lambda yes: yes and self.accept_glazed_update(version), key="glazed-update")
+
+    def accept_glazed_update(self, version: str):
+        _, saved_minecraft = self.get_saved_version()
+        self.save_version(version, saved_minecraft)
+        if saved_minecraft:
+            self.show_success(f"Installing for Minecraft {saved_minecraft}...")
+            self.selected_version = saved_minecraft
+            self.start_installation()
+        else:
+            self.show_success(f"Version {version} has been saved. Please select a Minecraft version and install.")
     
-    def download_file(self, url: str, filename: str, dest_dir: str = None) -> Optional[str]:
-        try:
-            if dest_dir:
-                file_path = os.path.join(dest_dir, filename)
-            else:
-                file_path = filename
-            with urllib.request.urlopen(url, timeout=30) as resp, open(file_path, 'wb') as file:
-                while True:
-                    chunk = resp.read(8192)
-                    if not chunk:
-                        break
-                    file.write(chunk)
-            return file_path
-        except Exception as e:
-            self.show_error(f"Error while downloading {filename}: {str(e)}")
-            return None
+    def resolve_install_targets(self, minecraft_version: str, on_resolved) -> None:
+        candidates = self.core.candidate_targets(minecraft_version)
+        if len(candidates) <= 1:
+            on_resolved(candidates)
+            return
+        preselected = [i for i, inst in enumerate(candidates) if inst["minecraft_version"] == minecraft_version]
+        self.decisions.ask(
+            lambda: self.picker_dialog(f"Install Glazed Client for Minecraft {minecraft_version} into:", candidates, preselected),
+            lambda dlg: on_resolved(dlg.selected_instances() if dlg.choice_yes else None),
+        )
     
     def show_error(self, message: str):
-        msg_box = QtWidgets.QMessageBox(self)
-        msg_box.setIcon(QtWidgets.QMessageBox.Critical)
-        msg_box.setWindowTitle("Error")
-        msg_box.setText(message)
-        msg_box.setStandardButtons(QtWidgets.QMessageBox.Ok)
-        palette = msg_box.palette()
-        palette.setColor(QtGui.QPalette.Window, QtGui.QColor(26, 26, 46))
-        palette.setColor(QtGui.QPalette.WindowText, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.Text, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.ButtonText, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.BrightText, QtGui.QColor(255, 255, 255))
-        msg_box.setPalette(palette)
-        msg_box.setStyleSheet("""
-            QMessageBox {
-                color: white;
-            }
-            QMessageBox QLabel {
-                color: white;
-                font-size: 14px;
-                background: transparent;
-            }
-            QMessageBox QPushButton {
-                background-color: #2a2a3e;
-                color: white;
-                border: 1px solid #3a3a4e;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-size: 13px;
-            }
-            QMessageBox QAbstractButton { color: white; }
-            QMessageBox QDialogButtonBox QPushButton { color: white; }
-            QMessageBox QPushButton:hover {
-                background-color: #3a3a4e;
-            }
-        """)
-        for button in msg_box.findChildren(QtWidgets.QPushButton):
-            button.setStyleSheet("color: white;")
-        msg_box.exec_()
+        print(f"Error: {message}")
+        self.notifications.notify(message, "error", 7000)
     
     def show_success(self, message: str):
-        msg_box = QtWidgets.QMessageBox(self)
-        msg_box.setIcon(QtWidgets.QMessageBox.Information)
-        msg_box.setWindowTitle("Success")
-        msg_box.setText(message)
-        msg_box.setStandardButtons(QtWidgets.QMessageBox.Ok)
-        palette = msg_box.palette()
-        palette.setColor(QtGui.QPalette.Window, QtGui.QColor(26, 26, 46))
-        palette.setColor(QtGui.QPalette.WindowText, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.Text, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.ButtonText, QtGui.QColor(255, 255, 255))
-        palette.setColor(QtGui.QPalette.BrightText, QtGui.QColor(255, 255, 255))
-        msg_box.setPalette(palette)
-        msg_box.setStyleSheet("""
-            QMessageBox {
-                color: white;
-            }
-            QMessageBox QLabel {
-                color: white;
-                font-size: 14px;
-                background: transparent;
-            }
-            QMessageBox QPushButton {
-                background-color: #2a2a3e;
-                color: white;
-                border: 1px solid #3a3a4e;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-size: 13px;
-            }
-            QMessageBox QAbstractButton { color: white; }
-            QMessageBox QDialogButtonBox QPushButton { color: white; }
-            QMessageBox QPushButton:hover {
-                background-color: #3a3a4e;
-            }
-        """)
-        for button in msg_box.findChildren(QtWidgets.QPushButton):
-            button.setStyleSheet("color: white;")
-        msg_box.exec_()
+        self.notifications.notify(message, "success", 5000)
     
-    def show_question(self, message: str) -> bool:
-        dlg = YesNoDialog(self, "Question", message)
-        dlg.exec_()
-        return dlg.choice_yes
+    def ask_question(self, message: str, on_answer, key: Optional[str] = None) -> bool:
+        return self.decisions.ask(lambda: self.question_dialog("Question", message),
+                                  lambda dlg: on_answer(dlg.choice_yes), key)
+
+    def watch_mods_folders(self):
+        self.mods_watcher.watch(inst["mods_path"] for inst in discover_minecraft_instances(self.core.options.extra_game_dirs))
+
+    def prewarm_dialogs(self):
+        self.dialog_pool.prewarm(YesNoDialog, InstancePickerDialog)
+        self.notifications.prewarm()
+
+    def question_dialog(self, title: str, message: str) -> YesNoDialog:
+        dlg = self.dialog_pool.get(YesNoDialog)
+        dlg.set_content(title, message)
+        return dlg
+
+    def picker_dialog(self, message: str, instances: List[Dict[str, str]], preselected: List[int]) -> InstancePickerDialog:
+        dlg = self.dialog_pool.get(InstancePickerDialog)
+        dlg.set_instances(message, instances, preselected)
+        return dlg
     
     def update_status(self, message: str):
         print(f"Status: {message}")
+        self.status_label.setText(message)
+
+    def on_progress_changed(self, snapshot: dict):
+        self.progress_bar.setValue(int(snapshot["fraction"] * 1000))
+        self.status_label.setText(describe_progress(snapshot))
     
     def start_installation(self):
         if not self.selected_version:
@@ -1092,79 +1588,128 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
         if self.is_installing:
             return
         self.is_installing = True
+        self.prefetch_timer.stop()
         print("Starting installation...")
         QtCore.QTimer.singleShot(0, self.install_mods)
     
     def install_mods(self):
+        self.install_started = time.monotonic()
+        self.core.telemetry.emit("install_start", minecraft_version=self.selected_version)
         try:
-            mods_path = self.get_minecraft_mods_path()
-            if not mods_path:
-                self.show_error("Cannot find Minecraft folder. Make sure the game is installed.")
-                return
-            QtWidgets.QApplication.processEvents()
-            
-            if not self.create_mods_directory(mods_path):
-                return
-            QtWidgets.QApplication.processEvents()
-
-            self.remove_old_mods(mods_path)
-            QtWidgets.QApplication.processEvents()
-            
-            if not self.download_urls or self.selected_version not in self.download_urls:
-                self.show_error("Failed to load download URLs. Please check your internet connection.")
-                return
-            QtWidgets.QApplication.processEvents()
-            
-            urls = self.download_urls[self.selected_version]
-            required_files = ["meteor-client", "baritone", "glazed"]
-            missing_files = [file for file in required_files if file not in urls]
-            if missing_files:
-                if "glazed" in missing_files:
-                    self.show_error("Glazed Client not found. Please check if the latest release is available.")
-                else:
-                    self.show_error(f"Missing required files: {', '.join(missing_files)}. Please try again later.")
-                return
-            QtWidgets.QApplication.processEvents()
-            
-            files_to_download = [
-                ("meteor-client", urls["meteor-client"], "glazedclient.com"),
-                ("baritone", urls["baritone"], "glazedclient.com"),
-                ("glazed", urls["glazed"], "glazedclient.com")
-            ]
-            for i, (file_type, url, source) in enumerate(files_to_download):
-                filename = url.split('/')[-1]
-                file_path = os.path.join(mods_path, filename)
-                if os.path.exists(file_path):
-                    if not self.show_question(f"File {filename} already exists. Do you want to overwrite it?"):
-                        continue
-                self.update_status(f"Downloading {filename} from {source}...")
-                QtWidgets.QApplication.processEvents()
-                result = self.download_file(url, filename, mods_path)
-                if not result:
-                    return
-                QtWidgets.QApplication.processEvents()
-                progress = (i + 1) / len(files_to_download)
-                print(f"Progress: {progress * 100:.1f}%")
-            self.update_status("Installation completed successfully!")
-            QtWidgets.QApplication.processEvents()
-            saved_glazed, _ = self.get_saved_version()
-            self.save_version(saved_glazed, self.selected_version)
-            self.show_success(
-                f"Glazed Client has been installed for Minecraft {self.selected_version}!\n\n"
-                f"Files have been placed in: {mods_path}\n\n"
-                "Launch Minecraft with the selected version to play with mods."
-            )
+            self.resolve_install_targets(self.selected_version, self.on_targets_resolved)
+        except InstallError as e:
+            self.show_error(str(e))
+            self.finish_install(False)
+
+    def on_targets_resolved(self, targets: Optional[List[Dict[str, str]]]):
+        if targets is None:
+            self.update_status("Installation cancelled.")
+            self.finish_install(False)
+            return
+        try:
+            plan = self.core.resolve_plan(self.selected_version, targets)
+        except InstallError as e:
+            self.show_error(str(e))
+            self.finish_install(False)
+            return
         except Exception as e:
             self.show_error(f"An unexpected error occurred during installation: {str(e)}")
+            self.finish_install(False)
+            return
+        self.mods_watcher.watch(target["mods_path"] for target in targets)
+        for warning in plan.warnings:
+            self.notifications.notify(warning, "info", 7000)
+        if not plan.existing:
+            self.start_downloads(plan)
+            return
+        names = sorted({filename for filename, _ in plan.existing})
+        places = sorted({target["name"] for _, target in plan.existing})
+        self.ask_question(
+            f"{len(plan.existing)} file(s) already exist in {', '.join(places)}:\n{', '.join(names)}\n\n"
+            "Overwrite all of them? Choose No to keep the existing files.",
+            lambda yes: self.start_downloads(self.core.set_overwrite(plan, yes)),
+        )
+
+    def start_downloads(self, plan: InstallPlan):
+        self.cancel_token = CancelToken()
+        progress = ProgressModel(self.progress_changed.emit, self.core.session_limiter)
+        source = self.core.describe_source(plan)
+        for artifact in plan.artifacts:
+            progress.add(artifact.filename)
+            self.update_status(f"Downloading {artifact.filename} from {source}...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.show()
+        self.download_thread = threading.Thread(target=self.install_worker, args=(plan, progress, self.cancel_token),
+                                                daemon=True)
+        self.download_thread.start()
+        self.mark_memory("install started")
+
+    def install_worker(self, plan: InstallPlan, progress: ProgressModel, cancel: CancelToken):
+        outcome = {"plan": plan, "errors": [], "installed": None, "error": None}
+        try:
+            fetched, outcome["errors"] = self.core.fetch(plan, progress, cancel)
+            if not outcome["errors"] and not cancel.cancelled:
+                outcome["errors"] = self.core.verify(plan, fetched)
+            self.mark_memory("downloaded")
+            if not outcome["errors"] and not cancel.cancelled:
+                outcome["installed"] = self.core.commit(plan, fetched, cancel)
+        except InstallCancelled:
+            pass
+        except Exception as e:
+            outcome["error"] = e
         finally:
-            print("Installation finished.")
-            self.is_installing = False
+            self.install_finished.emit(outcome)
+
+    def cancel_installation(self):
+        if self.is_installing and self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.update_status("Cancelling...")
 
-    def update_card_styles(self):
-        for i, card in enumerate(self.version_cards):
-            is_selected = (i == self.selected_card_index)
-            card.selected = is_selected
-            card.update()
+    def on_install_finished(self, outcome: dict):
+        plan = outcome["plan"]
+        succeeded = outcome["installed"] is not None
+        try:
+            if succeeded:
+                self.update_status("Installation completed successfully!")
+                placed_in = "\n".join(target["mods_path"] for target in plan.targets)
+                self.show_success(
+                    f"Glazed Client has been installed for Minecraft {plan.minecraft_version}!\n\n"
+                    f"Files have been placed in: {placed_in}\n\n"
+                    "Launch Minecraft with the selected version to play with mods."
+                )
+            elif self.cancel_token.cancelled:
+                self.update_status("Installation cancelled.")
+            elif outcome["errors"]:
+                filename, error = outcome["errors"][0]
+                self.show_error(f"Error while downloading {filename}: {str(error)}")
+            elif outcome["error"] is not None:
+                self.show_error(f"An unexpected error occurred during installation: {str(outcome['error'])}")
+        finally:
+            self.finish_install(succeeded)
+
+    def finish_install(self, succeeded: bool):
+        print("Installation finished.")
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+        self.core.telemetry.emit("install_end", minecraft_version=self.selected_version, ok=succeeded,
+                            duration=round(time.monotonic() - self.install_started, 4))
+        self.download_thread = None
+        self.is_installing = False
+        self.mark_memory("install finished")
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.prefetch_timer.stop()
+        self.core.prefetcher.cancel()
+        if self.update_check_cancel is not None:
+            self.update_check_cancel.cancel()
+        if self.is_installing and self.cancel_token is not None:
+            self.cancel_token.cancel()
+            if self.download_thread is not None:
+                self.download_thread.join(timeout=5)
+        super().closeEvent(event)
 
     def save_launch_btn_geometry(self):
         self.original_button_geometry = self.launch_btn.geometry()
@@ -1172,8 +1717,228 @@ class ModernGlazedInstaller(QtWidgets.QWidget):
 def check_dependencies():
     return True
 
+def parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Glazed Client Installer")
+    parser.add_argument("--list-instances", action="store_true",
+                        help="list detected Minecraft instances and exit")
+    parser.add_argument("--install", metavar="MC_VERSION",
+                        help="install without the window for the given Minecraft version; Ctrl+C cancels")
+    parser.add_argument("--game-dir", action="append", default=[], metavar="DIR",
+                        help="additional Minecraft game directory to install into (repeatable)")
+    parser.add_argument("--limit-rate", type=parse_rate, default=parse_rate(os.getenv(LIMIT_RATE_ENV)),
+                        metavar="RATE", help="total download bandwidth, e.g. 500k or 2M bytes per second")
+    parser.add_argument("--base-url", default=BASE_URL, metavar="URL",
+                        help=f"release server that hosts VERSION.txt and the jars (default {DEFAULT_BASE_URL})")
+    parser.add_argument("--mirror", action="append", metavar="URL",
+                        default=[m for m in re.split(r"[,\s]+", os.getenv(MIRRORS_ENV, "")) if m],
+                        help="additional download mirror base URL (repeatable)")
+    parser.add_argument("--export-pack", metavar="PACK",
+                        help="download the jars and write them with a hashed manifest into one file for offline installs")
+    parser.add_argument("--pack-version", action="append", metavar="MC_VERSION",
+                        help="Minecraft version to put into --export-pack (repeatable, default all)")
+    parser.add_argument("--import-pack", metavar="PACK",
+                        help="install from a pack written by --export-pack without using the network")
+    parser.add_argument("--peer", action="append", metavar="URL",
+                        default=[p for p in re.split(r"[,\s]+", os.getenv(PEERS_ENV, "")) if p],
+                        help="installer on the local network sharing its cache, tried before the release server (repeatable)")
+    parser.add_argument("--discover-peers", action="store_true",
+                        help="look for installers sharing their cache on the local network")
+    parser.add_argument("--serve-cache", action="store_true",
+                        help="share the local download cache with other installers until Ctrl+C (after --install if given)")
+    parser.add_argument("--peer-port", type=int, default=PEER_PORT, metavar="PORT",
+                        help=f"HTTP port used by --serve-cache (default {PEER_PORT})")
+    parser.add_argument("--durability", choices=DURABILITY_POLICIES, default=DURABILITY_COMMIT,
+                        help="'commit' fsyncs each file and its folder before it counts as installed")
+    parser.add_argument("--telemetry-file", default=TELEMETRY_FILE, metavar="PATH",
+                        help="JSON lines file that receives download and install events")
+    parser.add_argument("--no-telemetry", action="store_true",
+                        help="do not write the local telemetry log")
+    parser.add_argument("--report", action="store_true",
+                        help="print a summary of the telemetry log and exit")
+    parser.add_argument("--per-download-rate", type=parse_rate, default=0.0, metavar="RATE",
+                        help="bandwidth cap for each individual download")
+    parser.add_argument("--no-bundle", action="store_true",
+                        help="download the jars one by one instead of as a single per-version bundle")
+    parser.add_argument("--low-footprint", action="store_true",
+                        help="skip the animated background, free dialogs after use and stream downloads through a small fixed buffer")
+    parser.add_argument("--memory-report", nargs="?", const="", metavar="PATH",
+                        help="record tracemalloc snapshots and peak RSS and print them at exit; with PATH also write them as JSON")
+    parser.add_argument("--watch-stalls", nargs="?", type=int, const=STALL_THRESHOLD, metavar="MS",
+                        help=f"log the stack whenever the window's event loop is blocked longer than MS (default {STALL_THRESHOLD}) and summarize at exit")
+    parser.add_argument("--prefetch-rate", type=parse_rate,
+                        default=parse_rate(os.getenv(PREFETCH_RATE_ENV, str(DEFAULT_PREFETCH_RATE))), metavar="RATE",
+                        help="bandwidth for fetching the selected version in the background before Install; 0 turns it off")
+    return parser.parse_known_args(argv[1:])
+
+def print_instances(instances: List[Dict[str, str]]) -> None:
+    if not instances:
+        print("No Minecraft instances found.")
+        return
+    for instance in instances:
+        version = instance["minecraft_version"] or "unknown"
+        print(f"{instance['name']} [{instance['launcher']}] Minecraft {version}: {instance['mods_path']}")
+
+def headless_options(args) -> InstallOptions:
+    return InstallOptions(args.base_url, args.mirror, args.game_dir, args.limit_rate, args.per_download_rate,
+                          args.durability, None if args.no_telemetry else args.telemetry_file,
+                          use_bundles=not args.no_bundle, peers=args.peer, discover_peers=args.discover_peers,
+                          buffer_size=LOW_FOOTPRINT_BUFFER_SIZE if args.low_footprint else MAX_CHUNK_SIZE)
+
+def run_cancellable(work) -> Dict:
+    cancel = CancelToken()
+    def on_sigint(signum, frame):
+        print("\nCancelling (press Ctrl+C again to abort immediately)...")
+        cancel.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    previous_handler = signal.signal(signal.SIGINT, on_sigint)
+    outcome = {}
+    def worker():
+        try:
+            outcome["result"] = work(cancel)
+        except InstallCancelled:
+            outcome["cancelled"] = True
+        except Exception as e:
+            outcome["error"] = e
+    try:
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        while thread.is_alive():
+            thread.join(0.2)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    return outcome
+
+def console_progress(installer: Installer) -> ProgressModel:
+    return ProgressModel(lambda snapshot: print(describe_progress(snapshot).replace("\n", " | ")),
+                         installer.session_limiter, interval=1.0)
+
+def run_headless_install(args, memory: Optional[MemoryProfiler] = None) -> int:
+    minecraft_version = args.install
+    installer = Installer(headless_options(args))
+    if minecraft_version not in installer.download_urls():
+        print(f"Unsupported Minecraft version: {minecraft_version}")
+        return 2
+    try:
+        candidates = installer.candidate_targets(minecraft_version)
+    except InstallError as e:
+        print(e)
+        return 1
+    custom_dirs = {os.path.abspath(os.path.expanduser(d)) for d in args.game_dir}
+    targets = [inst for inst in candidates
+               if inst["minecraft_version"] == minecraft_version or inst["game_dir"] in custom_dirs] or candidates
+    if not targets:
+        print("Cannot find Minecraft folder. Make sure the game is installed.")
+        return 1
+    for target in targets:
+        print(f"Installing into {target['name']} [{target['launcher']}]: {target['mods_path']}")
+
+    progress = console_progress(installer)
+    if memory is not None:
+        memory.mark("install started")
+    outcome = run_cancellable(lambda cancel: installer.install(minecraft_version, targets, progress=progress,
+                                                               cancel=cancel, pack=args.import_pack, headless=True))
+    if memory is not None:
+        memory.mark("install finished")
+    if "error" in outcome:
+        print(f"Error: {outcome['error']}")
+        return 1
+    result = outcome["result"]
+    if result.cancelled:
+        print("Installation cancelled.")
+        return 130
+    if result.errors:
+        for filename, error in result.errors:
+            print(f"Error while downloading {filename}: {error}")
+        return 1
+    for warning in result.plan.warnings:
+        print(f"Warning: {warning}")
+    print(f"Glazed Client has been installed for Minecraft {minecraft_version}.")
+    return 0
+
+def run_export_pack(args) -> int:
+    installer = Installer(headless_options(args))
+    versions = args.pack_version or list(installer.download_urls())
+    progress = console_progress(installer)
+    outcome = run_cancellable(lambda cancel: installer.export_pack(args.export_pack, versions, progress, cancel))
+    if outcome.get("cancelled"):
+        print("Export cancelled.")
+        return 130
+    if "error" in outcome:
+        print(f"Error: {outcome['error']}")
+        return 1
+    manifest, digest = outcome["result"]
+    count = sum(len(version["files"]) for version in manifest["versions"].values())
+    print(f"Wrote {count} file(s) for Minecraft {', '.join(manifest['versions'])} to {args.export_pack}")
+    print(f"sha256 {digest} (also in {args.export_pack}.sha256)")
+    return 0
+
+def pack_install_version(args) -> Optional[str]:
+    try:
+        versions = list(read_pack_manifest(args.import_pack)["versions"])
+    except (OSError, tarfile.TarError, ValueError, VerificationError) as e:
+        print(f"Cannot read {args.import_pack}: {e}")
+        return None
+    if args.install:
+        if args.install not in versions:
+            print(f"{args.import_pack} has no files for Minecraft {args.install} (it has {', '.join(versions)})")
+            return None
+        return args.install
+    if len(versions) != 1:
+        print(f"{args.import_pack} holds Minecraft {', '.join(versions)}; choose one with --install")
+        return None
+    return versions[0]
+
+def finish_memory_report(memory: Optional[MemoryProfiler], path: Optional[str]) -> None:
+    if memory is None:
+        return
+    memory.mark("exit")
+    report = memory.write(path) if path else memory.report()
+    memory.stop()
+    print_memory_report(report)
+    if path:
+        print(f"Memory report written to {path}")
+
+def serve_cache(port: int) -> int:
+    try:
+        server = PeerCacheServer(port=port).start()
+    except OSError as e:
+        print(f"Cannot share the cache on port {port}: {e}")
+        return 1
+    print(f"Sharing the download cache on port {server.port}; other installers can use --peer http://<this machine>:{server.port} or --discover-peers")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
 def main():
-    app = QtWidgets.QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    if args.list_instances:
+        print_instances(discover_minecraft_instances(args.game_dir))
+        return
+    if args.report:
+        print_telemetry_report(args.telemetry_file)
+        return
+    if args.export_pack:
+        sys.exit(run_export_pack(args))
+    if args.import_pack:
+        args.install = pack_install_version(args)
+        if not args.install:
+            sys.exit(2)
+    memory = MemoryProfiler() if args.memory_report is not None else None
+    if memory is not None:
+        memory.mark("startup")
+    if args.install:
+        status = run_headless_install(args, memory)
+        finish_memory_report(memory, args.memory_report)
+        if status != 0 or not args.serve_cache:
+            sys.exit(status)
+    if args.serve_cache:
+        sys.exit(serve_cache(args.peer_port))
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     QtWidgets.QApplication.setStyle("Fusion")
     dark_palette = QtGui.QPalette()
     dark_color = QtGui.QColor(15, 15, 35)
@@ -1194,13 +1959,21 @@ def main():
     dark_palette.setColor(QtGui.QPalette.Highlight, highlight_color)
     dark_palette.setColor(QtGui.QPalette.HighlightedText, text_color)
     app.setPalette(dark_palette)
-    app.setStyleSheet(
-        "QMessageBox QLabel { color: white; }\n"
-        "QMessageBox QPushButton { color: white; }"
-    )
-    installer = ModernGlazedInstaller()
+    telemetry_file = None if args.no_telemetry else args.telemetry_file
+    installer = ModernGlazedInstaller(args.game_dir, args.limit_rate, args.per_download_rate, args.mirror,
+                                      telemetry_file, args.durability, args.base_url, args.prefetch_rate,
+                                      not args.no_bundle, args.peer, args.discover_peers, args.low_footprint, memory)
+    watchdog = None
+    if args.watch_stalls:
+        watchdog = StallWatchdog(args.watch_stalls, installer.core.telemetry, app)
+        watchdog.start()
     installer.show()
-    sys.exit(app.exec_())
+    status = app.exec_()
+    if watchdog is not None:
+        watchdog.stop()
+        watchdog.print_summary()
+    finish_memory_report(memory, args.memory_report)
+    sys.exit(status)
 
 if __name__ == "__main__":
     main() 